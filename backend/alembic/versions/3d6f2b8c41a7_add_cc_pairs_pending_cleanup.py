@@ -0,0 +1,46 @@
+"""add cc pairs pending cleanup
+
+Revision ID: 3d6f2b8c41a7
+Revises: f909a8242e78
+Create Date: 2026-10-16 11:47:05.218334
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3d6f2b8c41a7"
+down_revision = "f909a8242e78"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cc_pairs_pending_cleanup",
+        sa.Column("cc_pair_id", sa.Integer(), nullable=False),
+        sa.Column("marked_by", sa.String(), nullable=False),
+        sa.Column(
+            "marked_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("cc_pair_id"),
+    )
+    op.create_index(
+        op.f("ix_cc_pairs_pending_cleanup_marked_by"),
+        "cc_pairs_pending_cleanup",
+        ["marked_by"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_cc_pairs_pending_cleanup_marked_by"),
+        table_name="cc_pairs_pending_cleanup",
+    )
+    op.drop_table("cc_pairs_pending_cleanup")
@@ -0,0 +1,96 @@
+"""cascade cc pair children
+
+Revision ID: f909a8242e78
+Revises: 12635f6655b7
+Create Date: 2026-10-16 09:12:31.482913
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f909a8242e78"
+down_revision = "12635f6655b7"
+branch_labels = None
+depends_on = None
+
+
+# (table, column, referred table, constraint name to create)
+_CASCADE_FKS = [
+    (
+        "index_attempt",
+        "connector_credential_pair_id",
+        "connector_credential_pair",
+        "index_attempt_connector_credential_pair_id_fkey",
+    ),
+    (
+        "index_attempt_errors",
+        "connector_credential_pair_id",
+        "connector_credential_pair",
+        "index_attempt_errors_connector_credential_pair_id_fkey",
+    ),
+    (
+        "user_file",
+        "cc_pair_id",
+        "connector_credential_pair",
+        "user_file_cc_pair_id_fkey",
+    ),
+    (
+        "persona__user_file",
+        "user_file_id",
+        "user_file",
+        "persona__user_file_user_file_id_fkey",
+    ),
+    (
+        "document_set__connector_credential_pair",
+        "connector_credential_pair_id",
+        "connector_credential_pair",
+        "document_set__cc_pair_cc_pair_id_fkey",
+    ),
+    (
+        "user_group__connector_credential_pair",
+        "cc_pair_id",
+        "connector_credential_pair",
+        "user_group__cc_pair_cc_pair_id_fkey",
+    ),
+]
+
+
+def _drop_existing_fk(table: str, column: str, referred_table: str) -> None:
+    # the original constraints were created with Postgres' default names, which
+    # get truncated for the longer association tables, so look them up instead
+    inspector = sa.inspect(op.get_bind())
+    for fk in inspector.get_foreign_keys(table):
+        if (
+            fk["referred_table"] == referred_table
+            and fk["constrained_columns"] == [column]
+            and fk["name"]
+        ):
+            op.drop_constraint(fk["name"], table, type_="foreignkey")
+
+
+def upgrade() -> None:
+    for table, column, referred_table, name in _CASCADE_FKS:
+        _drop_existing_fk(table, column, referred_table)
+        op.create_foreign_key(
+            name,
+            table,
+            referred_table,
+            [column],
+            ["id"],
+            ondelete="CASCADE",
+        )
+
+
+def downgrade() -> None:
+    for table, column, referred_table, name in _CASCADE_FKS:
+        _drop_existing_fk(table, column, referred_table)
+        op.create_foreign_key(
+            name,
+            table,
+            referred_table,
+            [column],
+            ["id"],
+        )
@@ -3,134 +3,207 @@
 批量安全清理 - 分批处理 INITIAL_INDEXING CC Pairs
 """
 
+import atexit
+import queue
+import socket
 import time
 from datetime import datetime, timedelta, timezone
+from logging.handlers import QueueHandler, QueueListener
 from onyx.db.engine.sql_engine import get_session_with_current_tenant, SqlEngine
 from onyx.db.enums import ConnectorCredentialPairStatus
 from onyx.db.models import (
+    CCPairPendingCleanup,
     ConnectorCredentialPair, 
-    Connector, 
-    IndexAttempt, 
-    IndexAttemptError,
-    UserFile,
-    DocumentSet__ConnectorCredentialPair,
-    UserGroup__ConnectorCredentialPair,
-    Persona__UserFile,
-    DocumentByConnectorCredentialPair
+    Connector
 )
 from onyx.utils.logger import setup_logger
-from sqlalchemy import and_, func, select, delete
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from sqlalchemy import Select, and_, bindparam, func, literal, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
 
 logger = setup_logger()
 
-def cleanup_cc_pairs_batch(cc_pair_ids: list[int], batch_size: int = 100) -> dict:
-    """分批清理CC Pairs"""
+# IndexAttempt(Error)、UserFile、Persona__UserFile、DocumentSet/UserGroup 关联
+# 均通过 ON DELETE CASCADE 外键由数据库级联删除。
+# DocumentByConnectorCredentialPair 以 (connector_id, credential_id) 关联而非
+# cc_pair id，无法级联，需要单独删除；同一语句内的 CTE 共享同一快照，
+# 因此 del_docs 仍能关联到被 del_cc_pairs 删除的 CC Pairs。
+_DELETE_BATCH_SQL = text(
+    """
+    WITH del_docs AS (
+        DELETE FROM document_by_connector_credential_pair d
+        USING connector_credential_pair c
+        WHERE c.id = ANY(:ids)
+          AND d.connector_id = c.connector_id
+          AND d.credential_id = c.credential_id
+        RETURNING 1
+    ),
+    del_cc_pairs AS (
+        DELETE FROM connector_credential_pair
+        WHERE id = ANY(:ids)
+        RETURNING 1
+    ),
+    del_staged AS (
+        DELETE FROM cc_pairs_pending_cleanup
+        WHERE cc_pair_id = ANY(:ids)
+        RETURNING 1
+    )
+    SELECT
+        (SELECT count(*) FROM del_docs) AS documents,
+        (SELECT count(*) FROM del_cc_pairs) AS cc_pairs,
+        (SELECT count(*) FROM del_staged) AS staged
+    """
+)
+
+# 在模块级构建一次，各批次只重新绑定参数，命中 SQLAlchemy 的编译缓存
+_CLAIM_STAGED_BATCH = (
+    select(CCPairPendingCleanup.cc_pair_id)
+    .where(CCPairPendingCleanup.marked_by == bindparam("instance_name"))
+    .order_by(CCPairPendingCleanup.cc_pair_id)
+    .limit(bindparam("batch_size"))
+    .with_for_update(skip_locked=True)
+)
+
+def _claim_staged_batch(
+    db_session: Session, instance_name: str, batch_size: int
+) -> list[int]:
+    """锁定当前实例在暂存表中的下一批 CC Pair id
+
+    SKIP LOCKED 使并发的 worker 各自拿到互不重叠的批次，锁随批次事务提交释放。
+    """
+    return list(
+        db_session.scalars(
+            _CLAIM_STAGED_BATCH,
+            {"instance_name": instance_name, "batch_size": batch_size},
+        ).all()
+    )
+
+def count_staged_cc_pairs(db_session: Session, instance_name: str) -> int:
+    """统计当前实例暂存表中尚未清理的 CC Pairs"""
+    return db_session.execute(
+        select(func.count())
+        .select_from(CCPairPendingCleanup)
+        .where(CCPairPendingCleanup.marked_by == instance_name)
+    ).scalar_one()
+
+def stage_cc_pairs_for_cleanup(
+    db_session: Session, candidates_stmt: Select, instance_name: str
+) -> int:
+    """将待清理的 CC Pairs 写入暂存表，已被任一实例认领的 id 会被跳过
+
+    认领时对 CC Pair 行加 FOR UPDATE SKIP LOCKED，正被其他实例认领或删除的
+    行会被直接跳过，而不是等待其行锁释放。
+    """
+    claim_stmt = (
+        candidates_stmt
+        .add_columns(literal(instance_name))
+        .with_for_update(skip_locked=True, of=ConnectorCredentialPair)
+    )
+    stmt = (
+        insert(CCPairPendingCleanup)
+        .from_select(["cc_pair_id", "marked_by"], claim_stmt)
+        .on_conflict_do_nothing(index_elements=["cc_pair_id"])
+    )
+    result = db_session.execute(stmt)
+    db_session.commit()
+    return result.rowcount
+
+def cleanup_cc_pairs_batch(
+    db_session: Session,
+    instance_name: str,
+    batch_size: int = 100,
+    target_latency_ms: float = 20.0,
+    max_sleep: float = 1.0,
+) -> dict:
+    """分批清理当前实例暂存表中的 CC Pairs
+
+    每个批次从 cc_pairs_pending_cleanup 中锁定一批 id，可由多个 worker 并发调用；
+    批次成功后对应的暂存行一并删除，失败时保留，下次运行自动续做。
+    所有批次复用同一个 db_session (同一连接)，每个批次单独提交。
+    仅当某批次耗时超过 target_latency_ms 时 (数据库繁忙) 才暂停，
+    暂停时长为该批次耗时，且不超过 max_sleep 秒。
+    """
     total_results = {
         'processed': 0,
         'successful': 0,
         'failed': 0,
         'cc_pairs': 0,
-        'index_attempts': 0,
-        'index_errors': 0,
-        'user_files': 0,
-        'persona_user_files': 0,
-        'document_set_assocs': 0,
-        'user_group_assocs': 0,
         'documents': 0
     }
     
-    # 分批处理
-    for i in range(0, len(cc_pair_ids), batch_size):
-        batch_ids = cc_pair_ids[i:i + batch_size]
-        logger.info(f"Processing batch {i//batch_size + 1}: CC pairs {batch_ids[0]} to {batch_ids[-1]} ({len(batch_ids)} items)")
+    # 分批处理，直到暂存表中没有当前实例可认领的记录
+    batch_num = 0
+    while True:
+        batch_num += 1
+        batch_ids: list[int] = []
         
         try:
-            with get_session_with_current_tenant() as db_session:
-                # 批量删除相关数据
-                
-                # 1. Index Attempt Errors
-                index_errors_stmt = delete(IndexAttemptError).where(
-                    IndexAttemptError.connector_credential_pair_id.in_(batch_ids)
-                )
-                result = db_session.execute(index_errors_stmt)
-                total_results['index_errors'] += result.rowcount
-                
-                # 2. Index Attempts
-                index_attempts_stmt = delete(IndexAttempt).where(
-                    IndexAttempt.connector_credential_pair_id.in_(batch_ids)
-                )
-                result = db_session.execute(index_attempts_stmt)
-                total_results['index_attempts'] += result.rowcount
-                
-                # 3. Persona-UserFile 关联
-                persona_userfile_stmt = delete(Persona__UserFile).where(
-                    Persona__UserFile.user_file_id.in_(
-                        select(UserFile.id).where(UserFile.cc_pair_id.in_(batch_ids))
-                    )
-                )
-                result = db_session.execute(persona_userfile_stmt)
-                total_results['persona_user_files'] += result.rowcount
-                
-                # 4. User Files
-                user_files_stmt = delete(UserFile).where(UserFile.cc_pair_id.in_(batch_ids))
-                result = db_session.execute(user_files_stmt)
-                total_results['user_files'] += result.rowcount
-                
-                # 5. Document Set 关联
-                doc_set_stmt = delete(DocumentSet__ConnectorCredentialPair).where(
-                    DocumentSet__ConnectorCredentialPair.connector_credential_pair_id.in_(batch_ids)
-                )
-                result = db_session.execute(doc_set_stmt)
-                total_results['document_set_assocs'] += result.rowcount
-                
-                # 6. User Group 关联
-                user_group_stmt = delete(UserGroup__ConnectorCredentialPair).where(
-                    UserGroup__ConnectorCredentialPair.cc_pair_id.in_(batch_ids)
-                )
-                result = db_session.execute(user_group_stmt)
-                total_results['user_group_assocs'] += result.rowcount
-                
-                # 7. 清理 Documents (批量获取connector_id和credential_id)
-                cc_pair_info_stmt = select(
-                    ConnectorCredentialPair.connector_id,
-                    ConnectorCredentialPair.credential_id
-                ).where(ConnectorCredentialPair.id.in_(batch_ids))
-                cc_pair_info = db_session.execute(cc_pair_info_stmt).fetchall()
-                
-                for connector_id, credential_id in cc_pair_info:
-                    docs_stmt = delete(DocumentByConnectorCredentialPair).where(
-                        and_(
-                            DocumentByConnectorCredentialPair.connector_id == connector_id,
-                            DocumentByConnectorCredentialPair.credential_id == credential_id
-                        )
-                    )
-                    result = db_session.execute(docs_stmt)
-                    total_results['documents'] += result.rowcount
-                
-                # 8. 最后删除 CC Pairs
-                cc_pair_stmt = delete(ConnectorCredentialPair).where(
-                    ConnectorCredentialPair.id.in_(batch_ids)
-                )
-                result = db_session.execute(cc_pair_stmt)
-                total_results['cc_pairs'] += result.rowcount
-                
-                # 提交批次
+            batch_start = time.monotonic()
+            batch_ids = _claim_staged_batch(db_session, instance_name, batch_size)
+            if not batch_ids:
                 db_session.commit()
-                total_results['processed'] += len(batch_ids)
-                total_results['successful'] += len(batch_ids)
-                
-                logger.info(f"Batch {i//batch_size + 1} completed successfully - deleted {len(batch_ids)} CC pairs")
-                
-                # 避免过快处理
-                time.sleep(0.1)
+                break
+            
+            logger.info(f"Processing batch {batch_num}: CC pairs {batch_ids[0]} to {batch_ids[-1]} ({len(batch_ids)} items)")
+            
+            # 三个 DELETE 串成数据修改 CTE，一次往返完成整个批次
+            result = db_session.execute(
+                _DELETE_BATCH_SQL, {"ids": batch_ids}
+            ).one()
+            total_results['documents'] += result.documents
+            total_results['cc_pairs'] += result.cc_pairs
+            
+            # 提交批次
+            db_session.commit()
+            total_results['processed'] += len(batch_ids)
+            total_results['successful'] += len(batch_ids)
+            
+            logger.info(f"Batch {batch_num} completed successfully - deleted {len(batch_ids)} CC pairs")
+            
+            # 根据批次耗时自适应限速，数据库空闲时不做等待
+            batch_duration = time.monotonic() - batch_start
+            if batch_duration > target_latency_ms / 1000:
+                time.sleep(min(batch_duration, max_sleep))
                 
         except Exception as e:
-            logger.error(f"Error processing batch {i//batch_size + 1}: {e}")
+            # 失败批次的暂存记录会保留，继续执行只会重复失败，留待下次运行续做
+            logger.error(f"Error processing batch {batch_num}: {e}")
+            db_session.rollback()
+            total_results['processed'] += len(batch_ids)
             total_results['failed'] += len(batch_ids)
-            continue
+            break
     
     return total_results
 
+def _run_cleanup_worker(
+    instance_name: str,
+    batch_size: int,
+    target_latency_ms: float,
+    max_sleep: float,
+) -> dict:
+    """在独立会话中运行一个清理 worker"""
+    with get_session_with_current_tenant() as db_session:
+        return cleanup_cc_pairs_batch(
+            db_session,
+            instance_name,
+            batch_size,
+            target_latency_ms=target_latency_ms,
+            max_sleep=max_sleep,
+        )
+
+def _start_queued_logging() -> None:
+    """将 setup_logger 挂载的 handler 移到后台 QueueListener 线程
+
+    日志写入 (stdout / 文件) 不再阻塞批次处理线程，退出时 listener 负责刷完队列。
+    """
+    base_logger = logger.logger
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *base_logger.handlers, respect_handler_level=True)
+    base_logger.handlers = [QueueHandler(log_queue)]
+    listener.start()
+    atexit.register(listener.stop)
+
 def main():
     import argparse
     
@@ -139,12 +212,25 @@ def main():
     parser.add_argument("--batch-size", type=int, default=100, help="Batch size for processing (default: 100)")
     parser.add_argument("--dry-run", action="store_true", help="Show what would be deleted without actually deleting")
     parser.add_argument("--force", action="store_true", help="Skip confirmation prompt")
+    parser.add_argument("--confirm", type=str, default="", help="Pass DELETE_ALL to confirm up front and run unattended")
+    parser.add_argument("--target-latency-ms", type=float, default=20.0, help="Only throttle when a batch takes longer than this many ms (default: 20)")
+    parser.add_argument("--max-sleep", type=float, default=1.0, help="Maximum seconds to pause after a slow batch (default: 1.0)")
+    parser.add_argument("--workers", type=int, default=4, help="Number of batches processed concurrently, each on its own connection (default: 4)")
+    parser.add_argument("--instance-name", type=str, default=socket.gethostname(), help="Name used to claim CC pairs in the cleanup staging table; reuse it to resume an interrupted run (default: hostname)")
     
     args = parser.parse_args()
     
+    _start_queued_logging()
+    
+    # 预先校验确认口令，口令错误时在占用任何数据库资源之前退出
+    if args.confirm and args.confirm != "DELETE_ALL":
+        logger.error("Invalid --confirm token, expected 'DELETE_ALL'")
+        return
+    confirmed = args.force or args.confirm == "DELETE_ALL"
+    
     # 初始化数据库引擎
     try:
-        SqlEngine.init_engine(pool_size=10, max_overflow=20, app_name='batch_cleanup_script')
+        SqlEngine.init_engine(pool_size=args.workers + 2, max_overflow=args.workers, app_name='batch_cleanup_script')
         logger.info("Database engine initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize database engine: {e}")
@@ -153,38 +239,43 @@ def main():
     logger.info(f"Starting {'DRY RUN' if args.dry_run else 'ACTUAL'} batch cleanup of INITIAL_INDEXING CC pairs older than {args.days} days")
     
     # 获取需要清理的 CC Pairs
-    with get_session_with_current_tenant() as db_session:
-        cutoff_time = datetime.now(timezone.utc) - timedelta(days=args.days)
-        
-        stmt = (
-            select(ConnectorCredentialPair.id)
-            .join(Connector, ConnectorCredentialPair.connector_id == Connector.id)
-            .where(
-                and_(
-                    ConnectorCredentialPair.status == ConnectorCredentialPairStatus.INITIAL_INDEXING,
-                    Connector.time_created < cutoff_time
-                )
+    cutoff_time = datetime.now(timezone.utc) - timedelta(days=args.days)
+    
+    stmt = (
+        select(ConnectorCredentialPair.id)
+        .join(Connector, ConnectorCredentialPair.connector_id == Connector.id)
+        .where(
+            and_(
+                ConnectorCredentialPair.status == ConnectorCredentialPairStatus.INITIAL_INDEXING,
+                Connector.time_created < cutoff_time
             )
-            .order_by(ConnectorCredentialPair.id)
         )
-        
-        result = db_session.execute(stmt).fetchall()
-        cc_pair_ids = [row[0] for row in result]
+    )
+    
+    with get_session_with_current_tenant() as db_session:
+        cc_pair_count = db_session.execute(
+            select(func.count()).select_from(stmt.subquery())
+        ).scalar_one()
+        # 上次运行中断时遗留的暂存记录
+        leftover_count = count_staged_cc_pairs(db_session, args.instance_name)
     
-    if not cc_pair_ids:
+    if leftover_count:
+        logger.info(f"Found {leftover_count} CC pairs left staged by instance '{args.instance_name}', they will be resumed")
+    
+    if not cc_pair_count and not leftover_count:
         logger.info("No CC pairs found for cleanup")
         return
     
-    logger.info(f"Found {len(cc_pair_ids)} INITIAL_INDEXING CC pairs to clean up")
+    logger.info(f"Found {cc_pair_count} INITIAL_INDEXING CC pairs to clean up")
     logger.info(f"Will process in batches of {args.batch_size}")
     
     if args.dry_run:
-        logger.info(f"DRY RUN: Would clean up {len(cc_pair_ids)} CC pairs in {(len(cc_pair_ids) + args.batch_size - 1) // args.batch_size} batches")
+        logger.info(f"DRY RUN: Would clean up {cc_pair_count} CC pairs in {(cc_pair_count + args.batch_size - 1) // args.batch_size} batches")
         return
     
-    # 确认清理
-    if not args.force:
-        print(f"\n⚠️  DANGER: About to permanently delete {len(cc_pair_ids)} CC pairs and ALL related data!")
+    # 确认清理 (未预先确认时回退到交互式确认，此时未持有任何数据库会话)
+    if not confirmed:
+        print(f"\n⚠️  DANGER: About to permanently delete {cc_pair_count} CC pairs and ALL related data!")
         print(f"   Processing in batches of {args.batch_size}")
         print(f"   Make sure you have a database backup!")
         
@@ -193,21 +284,44 @@ def main():
             logger.info("Cleanup cancelled by user")
             return
     
-    # 执行清理
-    logger.info("Starting batch cleanup...")
-    results = cleanup_cc_pairs_batch(cc_pair_ids, args.batch_size)
+    # 在数据库内认领待清理的 CC Pairs，id 不经过 Python
+    with get_session_with_current_tenant() as db_session:
+        staged_count = stage_cc_pairs_for_cleanup(db_session, stmt, args.instance_name)
+    logger.info(f"Staged {staged_count} CC pairs for cleanup as instance '{args.instance_name}'")
+    
+    # 执行清理，每个 worker 使用自己的会话并在整个运行期间复用
+    logger.info(f"Starting batch cleanup with {args.workers} workers...")
+    results = {
+        'processed': 0,
+        'successful': 0,
+        'failed': 0,
+        'cc_pairs': 0,
+        'documents': 0
+    }
+    worker_results = run_functions_tuples_in_parallel(
+        [
+            (
+                _run_cleanup_worker,
+                (args.instance_name, args.batch_size, args.target_latency_ms, args.max_sleep),
+            )
+            for _ in range(args.workers)
+        ],
+        max_workers=args.workers,
+    )
+    for worker_result in worker_results:
+        for key, value in worker_result.items():
+            results[key] += value
+    
+    with get_session_with_current_tenant() as db_session:
+        remaining_count = count_staged_cc_pairs(db_session, args.instance_name)
+    if remaining_count:
+        logger.warning(f"{remaining_count} CC pairs remain staged for instance '{args.instance_name}', rerun to resume")
     
     logger.info("=== Batch Cleanup Results ===")
     logger.info(f"Processed: {results['processed']}")
     logger.info(f"Successful: {results['successful']}")
     logger.info(f"Failed: {results['failed']}")
     logger.info(f"CC Pairs deleted: {results['cc_pairs']}")
-    logger.info(f"Index attempts deleted: {results['index_attempts']}")
-    logger.info(f"Index errors deleted: {results['index_errors']}")
-    logger.info(f"User files deleted: {results['user_files']}")
-    logger.info(f"Persona-UserFile associations deleted: {results['persona_user_files']}")
-    logger.info(f"Document set associations deleted: {results['document_set_assocs']}")
-    logger.info(f"User group associations deleted: {results['user_group_assocs']}")
     logger.info(f"Documents deleted: {results['documents']}")
 
 if __name__ == "__main__":
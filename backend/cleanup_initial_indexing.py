@@ -8,148 +8,165 @@
 3. 使用现有的 connector_deletion 框架确保数据完整性
 """
 
-import time
 from datetime import datetime, timedelta, timezone
 
-from onyx.background.celery.tasks.connector_deletion.tasks import (
-    connector_deletion_task,
-)
-from onyx.db.connector_credential_pair import get_connector_credential_pair_from_id
-from onyx.db.engine import get_session_with_current_tenant
+from onyx.background.celery.versioned_apps.client import app as client_app
+from onyx.configs.constants import OnyxCeleryPriority
+from onyx.configs.constants import OnyxCeleryTask
+from onyx.db.engine.sql_engine import get_session_with_current_tenant
 from onyx.db.enums import ConnectorCredentialPairStatus
-from onyx.db.models import ConnectorCredentialPair, Connector
+from onyx.db.models import (
+    ConnectorCredentialPair,
+    Connector,
+    DocumentByConnectorCredentialPair,
+    IndexAttempt,
+    UserFile,
+)
 from onyx.utils.logger import setup_logger
-from sqlalchemy import and_, func, select
+from shared_configs.contextvars import get_current_tenant_id
+from sqlalchemy import Select, and_, func, literal, select, union_all, update
 
 logger = setup_logger()
 
-def get_old_initial_indexing_cc_pairs(days_threshold: int = 2) -> list[int]:
-    """获取超过指定天数的 INITIAL_INDEXING CC Pairs"""
-    with get_session_with_current_tenant() as db_session:
-        cutoff_time = datetime.now(timezone.utc) - timedelta(days=days_threshold)
-        
-        stmt = (
-            select(ConnectorCredentialPair.id)
-            .join(Connector, ConnectorCredentialPair.connector_id == Connector.id)
-            .where(
-                and_(
-                    ConnectorCredentialPair.status == ConnectorCredentialPairStatus.INITIAL_INDEXING,
-                    Connector.time_created < cutoff_time
-                )
+def get_old_initial_indexing_cc_pairs_stmt(days_threshold: int = 2) -> Select:
+    """超过指定天数的 INITIAL_INDEXING CC Pairs 的 id 查询
+
+    下游直接以子查询方式使用，id 无需加载到 Python 再作为 IN 列表传回数据库。
+    """
+    cutoff_time = datetime.now(timezone.utc) - timedelta(days=days_threshold)
+    
+    return (
+        select(ConnectorCredentialPair.id)
+        .join(Connector, ConnectorCredentialPair.connector_id == Connector.id)
+        .where(
+            and_(
+                ConnectorCredentialPair.status == ConnectorCredentialPairStatus.INITIAL_INDEXING,
+                Connector.time_created < cutoff_time
             )
         )
-        
-        result = db_session.execute(stmt)
-        cc_pair_ids = [row[0] for row in result.fetchall()]
-        
-        logger.info(f"Found {len(cc_pair_ids)} INITIAL_INDEXING CC pairs older than {days_threshold} days")
-        return cc_pair_ids
+        # 作为子查询嵌入 connector_credential_pair 的查询/UPDATE 时不能被自动关联
+        .correlate(None)
+    )
 
-def get_cleanup_statistics(cc_pair_ids: list[int]) -> dict:
+def get_cleanup_statistics(cc_pair_ids_stmt: Select) -> dict:
     """获取清理统计信息"""
-    if not cc_pair_ids:
-        return {}
-        
-    with get_session_with_current_tenant() as db_session:
-        # 统计相关数据量
-        from onyx.db.models import IndexAttempt, UserFile
-        from onyx.db.document import DocumentByConnectorCredentialPair
-        
-        stats = {}
-        
-        # Index attempts
-        index_attempts = db_session.execute(
-            select(func.count(IndexAttempt.id))
-            .where(IndexAttempt.connector_credential_pair_id.in_(cc_pair_ids))
-        ).scalar()
-        stats['index_attempts'] = index_attempts
-        
-        # User files  
-        user_files = db_session.execute(
-            select(func.count(UserFile.id))
-            .where(UserFile.cc_pair_id.in_(cc_pair_ids))
-        ).scalar()
-        stats['user_files'] = user_files
-        
+    cc_pair_ids = cc_pair_ids_stmt.scalar_subquery()
+    
+    # 三个统计合并为一条 UNION ALL 查询，只需一次数据库往返
+    stmt = union_all(
+        select(literal('index_attempts').label('key'), func.count(IndexAttempt.id))
+        .where(IndexAttempt.connector_credential_pair_id.in_(cc_pair_ids)),
+        select(literal('user_files').label('key'), func.count(UserFile.id))
+        .where(UserFile.cc_pair_id.in_(cc_pair_ids)),
         # Documents (approximate)
-        documents = db_session.execute(
-            select(func.count())
-            .select_from(DocumentByConnectorCredentialPair)
-            .join(ConnectorCredentialPair, 
-                  and_(
-                      DocumentByConnectorCredentialPair.connector_id == ConnectorCredentialPair.connector_id,
-                      DocumentByConnectorCredentialPair.credential_id == ConnectorCredentialPair.credential_id
-                  ))
-            .where(ConnectorCredentialPair.id.in_(cc_pair_ids))
-        ).scalar()
-        stats['documents'] = documents
-        
-        return stats
+        select(literal('documents').label('key'), func.count())
+        .select_from(DocumentByConnectorCredentialPair)
+        .join(ConnectorCredentialPair, 
+              and_(
+                  DocumentByConnectorCredentialPair.connector_id == ConnectorCredentialPair.connector_id,
+                  DocumentByConnectorCredentialPair.credential_id == ConnectorCredentialPair.credential_id
+              ))
+        .where(ConnectorCredentialPair.id.in_(cc_pair_ids)),
+    )
+    
+    with get_session_with_current_tenant() as db_session:
+        return {key: count for key, count in db_session.execute(stmt).all()}
 
-def safe_cleanup_initial_indexing(days_threshold: int = 2, dry_run: bool = True):
-    """安全清理历史 INITIAL_INDEXING CC Pairs"""
+def safe_cleanup_initial_indexing(
+    days_threshold: int = 2, dry_run: bool = True, confirm_token: str = ""
+):
+    """安全清理历史 INITIAL_INDEXING CC Pairs
+
+    confirm_token 为 'DELETE' 时跳过交互式确认，便于无人值守运行。
+    """
+    
+    if confirm_token and confirm_token != "DELETE":
+        logger.error("Invalid confirm token, expected 'DELETE'")
+        return
     
     logger.info(f"Starting {'DRY RUN' if dry_run else 'ACTUAL'} cleanup of INITIAL_INDEXING CC pairs older than {days_threshold} days")
     
-    # 获取需要清理的 CC Pairs
-    cc_pair_ids = get_old_initial_indexing_cc_pairs(days_threshold)
+    # 获取需要清理的 CC Pairs (以子查询形式传给下游，仅统计数量)
+    cc_pair_ids_stmt = get_old_initial_indexing_cc_pairs_stmt(days_threshold)
+    with get_session_with_current_tenant() as db_session:
+        cc_pair_count = db_session.execute(
+            select(func.count()).select_from(cc_pair_ids_stmt.subquery())
+        ).scalar_one()
+    
+    logger.info(f"Found {cc_pair_count} INITIAL_INDEXING CC pairs older than {days_threshold} days")
     
-    if not cc_pair_ids:
+    if not cc_pair_count:
         logger.info("No CC pairs found for cleanup")
         return
     
     # 获取统计信息
-    stats = get_cleanup_statistics(cc_pair_ids)
+    stats = get_cleanup_statistics(cc_pair_ids_stmt)
     logger.info(f"Cleanup will affect: {stats}")
     
     if dry_run:
-        logger.info(f"DRY RUN: Would delete {len(cc_pair_ids)} CC pairs and related data")
-        logger.info(f"CC Pair IDs: {cc_pair_ids[:10]}{'...' if len(cc_pair_ids) > 10 else ''}")
+        with get_session_with_current_tenant() as db_session:
+            sample_ids = list(
+                db_session.scalars(
+                    cc_pair_ids_stmt.order_by(ConnectorCredentialPair.id).limit(10)
+                ).all()
+            )
+        logger.info(f"DRY RUN: Would delete {cc_pair_count} CC pairs and related data")
+        logger.info(f"CC Pair IDs: {sample_ids}{'...' if cc_pair_count > 10 else ''}")
         return
     
     # 确认清理
-    print(f"\n⚠️  DANGER: About to delete {len(cc_pair_ids)} CC pairs and related data:")
-    print(f"   - CC Pairs: {len(cc_pair_ids)}")
+    print(f"\n⚠️  DANGER: About to delete {cc_pair_count} CC pairs and related data:")
+    print(f"   - CC Pairs: {cc_pair_count}")
     print(f"   - Index Attempts: {stats.get('index_attempts', 0)}")
     print(f"   - User Files: {stats.get('user_files', 0)}")
     print(f"   - Documents: {stats.get('documents', 0)}")
     
-    confirm = input("\nType 'DELETE' to confirm (case sensitive): ")
-    if confirm != "DELETE":
-        logger.info("Cleanup cancelled by user")
-        return
+    if confirm_token != "DELETE":
+        confirm = input("\nType 'DELETE' to confirm (case sensitive): ")
+        if confirm != "DELETE":
+            logger.info("Cleanup cancelled by user")
+            return
     
     # 执行清理
     logger.info("Starting actual cleanup...")
-    success_count = 0
-    error_count = 0
-    
-    for cc_pair_id in cc_pair_ids:
-        try:
-            logger.info(f"Deleting CC pair {cc_pair_id}")
-            
-            # 使用现有的 connector_deletion_task 确保完整清理
-            with get_session_with_current_tenant() as db_session:
-                cc_pair = get_connector_credential_pair_from_id(db_session, cc_pair_id)
-                if cc_pair:
-                    # 标记为 DELETING 状态
-                    cc_pair.status = ConnectorCredentialPairStatus.DELETING
-                    db_session.commit()
-                    
-                    # 调用删除任务
-                    connector_deletion_task.apply_async(args=[cc_pair_id])
-                    success_count += 1
-                    
-                    # 避免过快删除
-                    time.sleep(0.1)
-                else:
-                    logger.warning(f"CC pair {cc_pair_id} not found, may have been deleted already")
-                    
-        except Exception as e:
-            logger.error(f"Error deleting CC pair {cc_pair_id}: {e}")
-            error_count += 1
-    
-    logger.info(f"Cleanup completed: {success_count} successful, {error_count} errors")
+    
+    # 一条 UPDATE 批量标记为 DELETING；仅更新仍处于 INITIAL_INDEXING 的记录，
+    # 确认期间已被删除或状态已变化的 CC Pairs 会被跳过
+    with get_session_with_current_tenant() as db_session:
+        marked_ids = list(
+            db_session.scalars(
+                update(ConnectorCredentialPair)
+                .where(
+                    and_(
+                        ConnectorCredentialPair.id.in_(cc_pair_ids_stmt.scalar_subquery()),
+                        ConnectorCredentialPair.status == ConnectorCredentialPairStatus.INITIAL_INDEXING,
+                    )
+                )
+                .values(status=ConnectorCredentialPairStatus.DELETING)
+                .returning(ConnectorCredentialPair.id)
+                .execution_options(synchronize_session=False)
+            ).all()
+        )
+        db_session.commit()
+    marked_count = len(marked_ids)
+    
+    if marked_count < cc_pair_count:
+        logger.warning(f"{cc_pair_count - marked_count} CC pairs no longer in INITIAL_INDEXING, may have been deleted already")
+    
+    if not marked_ids:
+        logger.info("No CC pairs left to delete")
+        return
+    
+    # 由现有的 connector_deletion 框架统一拉起所有 DELETING 状态的 CC Pairs，
+    # 只需一次 broker 调用，而不是逐个投递删除任务
+    client_app.send_task(
+        OnyxCeleryTask.CHECK_FOR_CONNECTOR_DELETION,
+        priority=OnyxCeleryPriority.HIGH,
+        kwargs={"tenant_id": get_current_tenant_id()},
+    )
+    
+    logger.info(f"Cleanup scheduled: {marked_count} CC pairs marked for deletion")
+    logger.debug(f"CC pairs marked for deletion: {marked_ids}")
 
 if __name__ == "__main__":
     import argparse
@@ -158,10 +175,12 @@ if __name__ == "__main__":
     parser.add_argument("--days", type=int, default=2, help="Delete CC pairs older than N days (default: 2)")
     parser.add_argument("--dry-run", action="store_true", help="Show what would be deleted without actually deleting")
     parser.add_argument("--force", action="store_true", help="Skip confirmation prompt")
+    parser.add_argument("--confirm", type=str, default="", help="Pass DELETE to confirm up front and run unattended")
     
     args = parser.parse_args()
     
     safe_cleanup_initial_indexing(
         days_threshold=args.days,
-        dry_run=args.dry_run
+        dry_run=args.dry_run,
+        confirm_token=args.confirm
     )
\ No newline at end of file
@@ -8,7 +8,9 @@ import os
 import time
 import json
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Dict, Any, Optional
+from urllib3.util.retry import Retry
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
@@ -25,15 +27,46 @@ from onyx.configs.app_configs import (
 class DocumentUploadWorkflow:
     """Complete document upload workflow implementation"""
     
+    # /doc/file/status codes, parsed to int once per poll
+    _STATUS_SUCCESS = 60
+    _STATUS_FAILED = 61
+    _STATUS_PROCESSING = 10
+    _TERMINAL_STATUSES = frozenset({_STATUS_SUCCESS, _STATUS_FAILED})
+    
     def __init__(self, base_url: str = "http://localhost:8888"):
         self.base_url = base_url
         self.auth = Auth(QINIU_ACCESS_KEY, QINIU_SECRET_KEY)
         
+        # Upload tokens are valid for an hour; reuse one and rotate it a few
+        # minutes before it expires instead of re-signing on every upload
+        self._token: Optional[str] = None
+        self._token_exp = 0.0
+        self._token_ttl = 3300
+        
+        # Keep-alive session so the API calls and status polling reuse connections.
+        # Transport-level failures on idempotent requests are retried here; the
+        # application-level retry loop in create_connector_via_api still applies.
+        self.http = requests.Session()
+        self.http.headers.update({"Content-Type": "application/json"})
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=2,
+                status_forcelist=(502, 503, 504),
+            ),
+        )
+        self.http.mount("http://", adapter)
+        self.http.mount("https://", adapter)
+        
     def upload_file_to_qiniu(self, file_path: str, content: str) -> bool:
         """Upload file to Qiniu OSS"""
         try:
-            token = self.auth.upload_token(QINIU_DEFAULT_BUCKET)
-            ret, info = put_data(token, file_path, content.encode('utf-8'))
+            if self._token is None or time.time() > self._token_exp:
+                self._token = self.auth.upload_token(QINIU_DEFAULT_BUCKET, expires=3600)
+                self._token_exp = time.time() + self._token_ttl
+            ret, info = put_data(self._token, file_path, content.encode('utf-8'))
             
             if info.status_code == 200:
                 print(f"✅ File uploaded to Qiniu: {file_path}")
@@ -71,10 +104,9 @@ class DocumentUploadWorkflow:
             try:
                 print(f"📤 Attempt {attempt + 1}/{retry_count}: Calling upload-path API")
                 
-                response = requests.post(
+                response = self.http.post(
                     f"{self.base_url}/doc/file/upload-path",
-                    json=payload,
-                    headers={"Content-Type": "application/json"}
+                    json=payload
                 )
                 
                 result = response.json()
@@ -97,44 +129,56 @@ class DocumentUploadWorkflow:
         print(f"❌ All {retry_count} attempts failed")
         return {"success": False, "message": "Max retries exceeded"}
     
+    @staticmethod
+    def _parse_status(status: Any) -> Optional[int]:
+        """Parse a status code such as "60" to an int, None if not numeric"""
+        status_str = str(status)
+        return int(status_str) if status_str.isdigit() else None
+    
     def check_processing_status(
         self, 
         folder_name: str, 
         max_wait_time: int = 60,
         check_interval: int = 5
     ) -> Dict[str, Any]:
-        """Check processing status with polling"""
+        """Check processing status with exponential backoff polling
+        
+        Polls after 0.5s, 1s, 2s, ... with the delay capped at check_interval,
+        so fast jobs are detected quickly and slow jobs are not polled too often.
+        """
         
-        start_time = time.time()
+        deadline = time.time() + max_wait_time
+        delay = 0.5
         
-        while time.time() - start_time < max_wait_time:
+        while time.time() < deadline:
             try:
-                response = requests.get(
+                response = self.http.get(
                     f"{self.base_url}/doc/file/status",
                     params={"doc_folder_name": folder_name}
                 )
                 
                 result = response.json()
                 status = result.get("status", "unknown")
+                status_code = self._parse_status(status)
                 
                 print(f"📊 Status: {status} - {result.get('desc', 'No description')}")
                 
-                if status == "60":  # Success
-                    print("✅ Processing completed successfully")
+                if status_code in self._TERMINAL_STATUSES:
+                    if status_code == self._STATUS_SUCCESS:
+                        print("✅ Processing completed successfully")
+                    else:
+                        print("❌ Processing failed")
                     return result
-                elif status == "61":  # Failed
-                    print("❌ Processing failed")
-                    return result
-                elif status == "10":  # Processing
-                    print(f"⏳ Still processing... (waiting {check_interval}s)")
-                    time.sleep(check_interval)
+                elif status_code == self._STATUS_PROCESSING:
+                    print(f"⏳ Still processing... (waiting {delay}s)")
                 else:  # Waiting or unknown
-                    print(f"⏳ Waiting for processing to start... (waiting {check_interval}s)")
-                    time.sleep(check_interval)
+                    print(f"⏳ Waiting for processing to start... (waiting {delay}s)")
                     
             except Exception as e:
                 print(f"❌ Status check error: {e}")
-                time.sleep(check_interval)
+            
+            time.sleep(max(0, min(delay, deadline - time.time())))
+            delay = min(delay * 2, check_interval)
         
         print(f"⏰ Timeout after {max_wait_time} seconds")
         return {"status": "timeout", "desc": "Processing timeout"}
@@ -215,7 +259,7 @@ End of test document.
         print(f"Final Status: {final_status.get('status', 'unknown')}")
         print(f"Description: {final_status.get('desc', 'No description')}")
         
-        success = final_status.get("status") == "60"
+        success = self._parse_status(final_status.get("status")) == self._STATUS_SUCCESS
         print(f"\n🎯 Result: {'✅ SUCCESS' if success else '❌ FAILED'}")
         
         return success
@@ -1,3 +1,5 @@
+from collections.abc import Mapping
+from collections.abc import Sequence
 from datetime import timedelta
 from typing import Any
 
@@ -9,7 +11,7 @@ from onyx.background.celery.tasks.beat_schedule import BEAT_EXPIRES_DEFAULT
 from onyx.background.celery.tasks.beat_schedule import (
     beat_task_templates as base_beat_task_templates,
 )
-from onyx.background.celery.tasks.beat_schedule import generate_cloud_tasks
+from onyx.background.celery.tasks.beat_schedule import CloudTaskSchedule
 from onyx.background.celery.tasks.beat_schedule import (
     get_tasks_to_schedule as base_get_tasks_to_schedule,
 )
@@ -85,15 +87,19 @@ if not MULTI_TENANT:
         },
     ]
 
+# the EE + base lists are fixed at import, so the generator specs derived from the
+# templates are built once (on first use) and the result is reused per multiplier
+_cloud_task_schedule = CloudTaskSchedule(
+    ee_beat_system_tasks + base_beat_system_tasks,
+    ee_beat_task_templates + base_beat_task_templates,
+)
+
 
-def get_cloud_tasks_to_schedule(beat_multiplier: float) -> list[dict[str, Any]]:
-    beat_system_tasks = ee_beat_system_tasks + base_beat_system_tasks
-    beat_task_templates = ee_beat_task_templates + base_beat_task_templates
-    cloud_tasks = generate_cloud_tasks(
-        beat_system_tasks, beat_task_templates, beat_multiplier
-    )
-    return cloud_tasks
+def get_cloud_tasks_to_schedule(
+    beat_multiplier: float,
+) -> Sequence[Mapping[str, Any]]:
+    return _cloud_task_schedule.get(beat_multiplier)
 
 
-def get_tasks_to_schedule() -> list[dict[str, Any]]:
-    return ee_tasks_to_schedule + base_get_tasks_to_schedule()
+def get_tasks_to_schedule() -> Sequence[Mapping[str, Any]]:
+    return [*ee_tasks_to_schedule, *base_get_tasks_to_schedule()]
@@ -8,6 +8,9 @@ from redis.lock import Lock as RedisLock
 from ee.onyx.server.tenants.product_gating import get_gated_tenants
 from onyx.background.celery.apps.app_base import task_logger
 from onyx.background.celery.tasks.beat_schedule import BEAT_EXPIRES_DEFAULT
+from onyx.background.celery.tasks.beat_schedule import (
+    CLOUD_GENERATOR_BATCH_SIZE_DEFAULT,
+)
 from onyx.configs.constants import CELERY_GENERIC_BEAT_LOCK_TIMEOUT
 from onyx.configs.constants import ONYX_CLOUD_TENANT_ID
 from onyx.configs.constants import OnyxCeleryPriority
@@ -16,6 +19,7 @@ from onyx.configs.constants import OnyxRedisLocks
 from onyx.db.engine.tenant_utils import get_all_tenant_ids
 from onyx.redis.redis_pool import get_redis_client
 from onyx.redis.redis_pool import redis_lock_dump
+from onyx.utils.batching import batch_generator
 from shared_configs.configs import IGNORED_SYNCING_TENANT_LIST
 
 
@@ -31,6 +35,7 @@ def cloud_beat_task_generator(
     queue: str = OnyxCeleryTask.DEFAULT,
     priority: int = OnyxCeleryPriority.MEDIUM,
     expires: int = BEAT_EXPIRES_DEFAULT,
+    batch_size: int = CLOUD_GENERATOR_BATCH_SIZE_DEFAULT,
 ) -> bool | None:
     """a lightweight task used to kick off individual beat tasks per tenant."""
     time_start = time.monotonic()
@@ -53,31 +58,39 @@ def cloud_beat_task_generator(
     try:
         tenant_ids = get_all_tenant_ids()
         gated_tenants = get_gated_tenants()
-        for tenant_id in tenant_ids:
-            if tenant_id in gated_tenants:
-                continue
+        dispatch_tenant_ids = (
+            tenant_id
+            for tenant_id in tenant_ids
+            if tenant_id not in gated_tenants
+            # needed in the cloud
+            and not (
+                IGNORED_SYNCING_TENANT_LIST and tenant_id in IGNORED_SYNCING_TENANT_LIST
+            )
+        )
 
+        for tenant_id_batch in batch_generator(dispatch_tenant_ids, batch_size):
             current_time = time.monotonic()
             if current_time - last_lock_time >= (CELERY_GENERIC_BEAT_LOCK_TIMEOUT / 4):
                 lock_beat.reacquire()
                 last_lock_time = current_time
 
-            # needed in the cloud
-            if IGNORED_SYNCING_TENANT_LIST and tenant_id in IGNORED_SYNCING_TENANT_LIST:
-                continue
-
-            self.app.send_task(
-                task_name,
-                kwargs=dict(
-                    tenant_id=tenant_id,
-                ),
-                queue=queue,
-                priority=priority,
-                expires=expires,
-                ignore_result=True,
-            )
+            # publish the whole batch through one pooled producer so the broker
+            # connection is acquired once per batch instead of once per tenant
+            with self.app.producer_or_acquire() as producer:
+                for tenant_id in tenant_id_batch:
+                    self.app.send_task(
+                        task_name,
+                        kwargs=dict(
+                            tenant_id=tenant_id,
+                        ),
+                        queue=queue,
+                        priority=priority,
+                        expires=expires,
+                        ignore_result=True,
+                        producer=producer,
+                    )
 
-            num_processed_tenants += 1
+                    num_processed_tenants += 1
     except SoftTimeLimitExceeded:
         task_logger.info(
             "Soft time limit exceeded, task is being terminated gracefully."
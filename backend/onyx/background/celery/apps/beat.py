@@ -1,7 +1,10 @@
+from collections.abc import Mapping
+from collections.abc import Sequence
 from datetime import timedelta
 from typing import Any
 
 from celery import Celery
+from celery import schedules
 from celery import signals
 from celery.beat import PersistentScheduler  # type: ignore
 from celery.signals import beat_init
@@ -92,8 +95,8 @@ class DynamicTenantScheduler(PersistentScheduler):
                 "get_cloud_tasks_to_schedule",
             )
 
-            cloud_tasks_to_schedule: list[dict[str, Any]] = get_cloud_tasks_to_schedule(
-                beat_multiplier
+            cloud_tasks_to_schedule: Sequence[Mapping[str, Any]] = (
+                get_cloud_tasks_to_schedule(beat_multiplier)
             )
             for task in cloud_tasks_to_schedule:
                 task_name = task["name"]
@@ -115,7 +118,7 @@ class DynamicTenantScheduler(PersistentScheduler):
             "onyx.background.celery.tasks.beat_schedule", "get_tasks_to_schedule"
         )
 
-        tasks_to_schedule: list[dict[str, Any]] = get_tasks_to_schedule()
+        tasks_to_schedule: Sequence[Mapping[str, Any]] = get_tasks_to_schedule()
 
         for tenant_id in tenant_ids:
             if IGNORED_SYNCING_TENANT_LIST and tenant_id in IGNORED_SYNCING_TENANT_LIST:
@@ -196,14 +199,23 @@ class DynamicTenantScheduler(PersistentScheduler):
             },
         )
 
-        # Create schedule entries
+        # Create schedule entries. Most tenants share the same handful of intervals,
+        # so build one (stateless) celery schedule per interval and share it rather
+        # than letting every entry construct its own from the timedelta
         entries = {}
+        run_every_schedules: dict[timedelta, schedules.schedule] = {}
         for name, entry in new_schedule.items():
+            run_every: timedelta = entry["schedule"]
+            run_every_schedule = run_every_schedules.get(run_every)
+            if run_every_schedule is None:
+                run_every_schedule = schedules.schedule(run_every, app=self.app)
+                run_every_schedules[run_every] = run_every_schedule
+
             entries[name] = self.Entry(
                 name=name,
                 app=self.app,
                 task=entry["task"],
-                schedule=entry["schedule"],
+                schedule=run_every_schedule,
                 options=entry.get("options", {}),
                 kwargs=entry.get("kwargs", {}),
             )
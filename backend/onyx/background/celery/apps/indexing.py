@@ -12,6 +12,8 @@ from celery.signals import worker_ready
 from celery.signals import worker_shutdown
 
 import onyx.background.celery.apps.app_base as app_base
+from onyx.background.indexing.job_client import start_forkserver
+from onyx.configs.app_configs import INDEXING_CHILD_USE_FORKSERVER
 from onyx.configs.constants import POSTGRES_CELERY_WORKER_INDEXING_APP_NAME
 from onyx.db.engine.sql_engine import SqlEngine
 from onyx.utils.logger import setup_logger
@@ -73,6 +75,12 @@ def on_worker_init(sender: Worker, **kwargs: Any) -> None:
     app_base.wait_for_db(sender, **kwargs)
     app_base.wait_for_vespa_or_shutdown(sender, **kwargs)
 
+    if INDEXING_CHILD_USE_FORKSERVER:
+        # import the indexing code once in the forkserver, so each spawned indexing
+        # child starts warm instead of re-importing it
+        start_forkserver(["onyx.background.celery.tasks.indexing.tasks"])
+        logger.info("Indexing forkserver started.")
+
     # Less startup checks in multi-tenant case
     if MULTI_TENANT:
         return
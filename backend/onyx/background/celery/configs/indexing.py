@@ -26,4 +26,6 @@ task_acks_late = shared_config.task_acks_late
 
 worker_concurrency = CELERY_WORKER_INDEXING_CONCURRENCY
 worker_pool = "threads"
-worker_prefetch_multiplier = 2
+# indexing tasks run for minutes to hours, so a prefetched task can sit behind a
+# long running one while other workers are idle. only reserve what we're running.
+worker_prefetch_multiplier = 1
@@ -17,4 +17,6 @@ task_acks_late = shared_config.task_acks_late
 
 worker_concurrency = 4
 worker_pool = "threads"
+# the indexing, pruning and vespa sync checks on this queue vary a lot in runtime,
+# so don't let a worker reserve more than the task it's running
 worker_prefetch_multiplier = 1
@@ -1,6 +1,7 @@
 # backend/onyx/background/celery/memory_monitoring.py
 import logging
 import os
+import threading
 from logging.handlers import RotatingFileHandler
 
 import psutil
@@ -45,6 +46,29 @@ else:
     memory_logger.addHandler(logging.NullHandler())
 
 
+# psutil.Process objects are kept between emits so that cpu_percent can report usage
+# since the previous emit without blocking on a sampling interval
+_processes: dict[int, psutil.Process] = {}
+_processes_lock = threading.Lock()
+
+
+def _get_process(pid: int) -> psutil.Process:
+    with _processes_lock:
+        # drop processes that have exited (is_running also catches reused pids)
+        for cached_pid, cached_process in list(_processes.items()):
+            if not cached_process.is_running():
+                del _processes[cached_pid]
+
+        process = _processes.get(pid)
+        if process is None:
+            process = psutil.Process(pid)
+            # the first cpu_percent call only starts the measurement and returns 0.0
+            process.cpu_percent(interval=None)
+            _processes[pid] = process
+
+        return process
+
+
 def emit_process_memory(
     pid: int, process_name: str, additional_metadata: dict[str, str | int]
 ) -> None:
@@ -53,9 +77,10 @@ def emit_process_memory(
         return
 
     try:
-        process = psutil.Process(pid)
+        process = _get_process(pid)
         memory_info = process.memory_info()
-        cpu_percent = process.cpu_percent(interval=0.1)
+        # non-blocking, measured since the previous call (primed in _get_process)
+        cpu_percent = process.cpu_percent(interval=None)
 
         # Build metadata string from additional_metadata dictionary
         metadata_str = " ".join(
@@ -1,5 +1,11 @@
-import copy
+import functools
+import sys
+from collections.abc import Mapping
+from collections.abc import Sequence
+from dataclasses import dataclass
 from datetime import timedelta
+from itertools import chain
+from types import MappingProxyType
 from typing import Any
 
 from onyx.configs.app_configs import ENTERPRISE_EDITION_ENABLED
@@ -24,6 +30,14 @@ BEAT_EXPIRES_DEFAULT = 15 * 60  # 15 minutes (in seconds)
 CLOUD_BEAT_MULTIPLIER_DEFAULT = 8.0
 CLOUD_DOC_PERMISSION_SYNC_MULTIPLIER_DEFAULT = 1.0
 
+# plain ints rather than enum members in the task dicts. Celery only ever sends the
+# integer value, and beat doesn't have to pickle enum references into its schedule.
+# Use OnyxCeleryPriority(value) if the enum is ever needed back.
+_PRIORITY_HIGHEST = int(OnyxCeleryPriority.HIGHEST)
+_PRIORITY_HIGH = int(OnyxCeleryPriority.HIGH)
+_PRIORITY_MEDIUM = int(OnyxCeleryPriority.MEDIUM)
+_PRIORITY_LOW = int(OnyxCeleryPriority.LOW)
+
 # tasks that run in either self-hosted on cloud
 beat_task_templates: list[dict] = [
     {
@@ -31,7 +45,7 @@ beat_task_templates: list[dict] = [
         "task": OnyxCeleryTask.CHECK_KG_PROCESSING,
         "schedule": timedelta(seconds=60),
         "options": {
-            "priority": OnyxCeleryPriority.MEDIUM,
+            "priority": _PRIORITY_MEDIUM,
             "expires": BEAT_EXPIRES_DEFAULT,
         },
     },
@@ -40,7 +54,7 @@ beat_task_templates: list[dict] = [
         "task": OnyxCeleryTask.CHECK_KG_PROCESSING_CLUSTERING_ONLY,
         "schedule": timedelta(seconds=600),
         "options": {
-            "priority": OnyxCeleryPriority.LOW,
+            "priority": _PRIORITY_LOW,
             "expires": BEAT_EXPIRES_DEFAULT,
         },
     },
@@ -49,7 +63,7 @@ beat_task_templates: list[dict] = [
         "task": OnyxCeleryTask.CHECK_FOR_INDEXING,
         "schedule": timedelta(seconds=15),
         "options": {
-            "priority": OnyxCeleryPriority.MEDIUM,
+            "priority": _PRIORITY_MEDIUM,
             "expires": BEAT_EXPIRES_DEFAULT,
         },
     },
@@ -58,7 +72,7 @@ beat_task_templates: list[dict] = [
         "task": OnyxCeleryTask.CHECK_FOR_CHECKPOINT_CLEANUP,
         "schedule": timedelta(hours=1),
         "options": {
-            "priority": OnyxCeleryPriority.LOW,
+            "priority": _PRIORITY_LOW,
             "expires": BEAT_EXPIRES_DEFAULT,
         },
     },
@@ -67,7 +81,7 @@ beat_task_templates: list[dict] = [
         "task": OnyxCeleryTask.CHECK_FOR_CONNECTOR_DELETION,
         "schedule": timedelta(seconds=20),
         "options": {
-            "priority": OnyxCeleryPriority.MEDIUM,
+            "priority": _PRIORITY_MEDIUM,
             "expires": BEAT_EXPIRES_DEFAULT,
         },
     },
@@ -76,7 +90,7 @@ beat_task_templates: list[dict] = [
         "task": OnyxCeleryTask.CHECK_FOR_VESPA_SYNC_TASK,
         "schedule": timedelta(seconds=20),
         "options": {
-            "priority": OnyxCeleryPriority.MEDIUM,
+            "priority": _PRIORITY_MEDIUM,
             "expires": BEAT_EXPIRES_DEFAULT,
         },
     },
@@ -87,7 +101,7 @@ beat_task_templates: list[dict] = [
             days=1
         ),  # This should essentially always be triggered manually for user folder updates.
         "options": {
-            "priority": OnyxCeleryPriority.MEDIUM,
+            "priority": _PRIORITY_MEDIUM,
             "expires": BEAT_EXPIRES_DEFAULT,
         },
     },
@@ -96,7 +110,7 @@ beat_task_templates: list[dict] = [
         "task": OnyxCeleryTask.CHECK_FOR_PRUNING,
         "schedule": timedelta(seconds=20),
         "options": {
-            "priority": OnyxCeleryPriority.MEDIUM,
+            "priority": _PRIORITY_MEDIUM,
             "expires": BEAT_EXPIRES_DEFAULT,
         },
     },
@@ -123,7 +137,7 @@ beat_task_templates: list[dict] = [
         "task": OnyxCeleryTask.MONITOR_BACKGROUND_PROCESSES,
         "schedule": timedelta(minutes=5),
         "options": {
-            "priority": OnyxCeleryPriority.LOW,
+            "priority": _PRIORITY_LOW,
             "expires": BEAT_EXPIRES_DEFAULT,
             "queue": OnyxCeleryQueues.MONITORING,
         },
@@ -162,35 +176,92 @@ if LLM_MODEL_UPDATE_API_URL:
             "task": OnyxCeleryTask.CHECK_FOR_LLM_MODEL_UPDATE,
             "schedule": timedelta(hours=1),  # Check every hour
             "options": {
-                "priority": OnyxCeleryPriority.LOW,
+                "priority": _PRIORITY_LOW,
                 "expires": BEAT_EXPIRES_DEFAULT,
             },
         }
     )
 
 
-def make_cloud_generator_task(task: dict[str, Any]) -> dict[str, Any]:
-    cloud_task: dict[str, Any] = {}
+@functools.lru_cache(maxsize=128)
+def _scaled_schedule(schedule_seconds: float, beat_multiplier: float) -> timedelta:
+    # the multiplier only changes when it's adjusted via redis, so the same
+    # (schedule, multiplier) pairs come back on every beat tick
+    return timedelta(seconds=schedule_seconds * beat_multiplier)
+
+
+@dataclass(frozen=True, slots=True)
+class BeatTaskSpec:
+    """A beat task in typed form. Celery beat consumes plain dicts, so specs are only
+    turned into that shape at the boundary via to_beat_task. The schedule is kept as
+    float seconds and only becomes a timedelta there as well."""
+
+    name: str
+    task: str
+    schedule_seconds: float
+    priority: int
+    expires: int
+    queue: str | None = None
+    kwargs: dict[str, Any] | None = None
+
+    def to_beat_task(self, beat_multiplier: float = 1.0) -> dict[str, Any]:
+        options: dict[str, Any] = {"priority": self.priority, "expires": self.expires}
+        if self.queue is not None:
+            options["queue"] = self.queue
+
+        beat_task: dict[str, Any] = {
+            "name": self.name,
+            "task": self.task,
+            "schedule": _scaled_schedule(self.schedule_seconds, beat_multiplier),
+            "options": options,
+        }
+        if self.kwargs is not None:
+            beat_task["kwargs"] = self.kwargs
+
+        return beat_task
+
 
-    # constant options for cloud beat task generators
-    task_schedule: timedelta = task["schedule"]
-    cloud_task["schedule"] = task_schedule
-    cloud_task["options"] = {}
-    cloud_task["options"]["priority"] = OnyxCeleryPriority.HIGHEST
-    cloud_task["options"]["expires"] = BEAT_EXPIRES_DEFAULT
+# options of the original task that are forwarded to the cloud beat task generator
+# a tuple rather than a set, so the kwargs order stays the same across processes
+_CLOUD_GENERATOR_OPTIONAL_FIELDS = ("queue", "priority", "expires")
+_MISSING = object()
 
-    # settings dependent on the original task
-    cloud_task["name"] = f"{ONYX_CLOUD_CELERY_TASK_PREFIX}_{task['name']}"
-    cloud_task["task"] = OnyxCeleryTask.CLOUD_BEAT_TASK_GENERATOR
-    cloud_task["kwargs"] = {}
-    cloud_task["kwargs"]["task_name"] = task["task"]
+# how many tenants the cloud beat task generator publishes per pooled broker producer.
+# templates can override this with a "batch_size" key. High priority tasks use smaller
+# batches so the first tenants aren't held up behind a large batch.
+CLOUD_GENERATOR_BATCH_SIZE_DEFAULT = 64
+CLOUD_GENERATOR_BATCH_SIZE_HIGH_PRIORITY = 16
 
-    optional_fields = ["queue", "priority", "expires"]
-    for field in optional_fields:
-        if field in task["options"]:
-            cloud_task["kwargs"][field] = task["options"][field]
 
-    return cloud_task
+def make_cloud_generator_task(task: dict[str, Any]) -> BeatTaskSpec:
+    task_options: dict[str, Any] = task["options"]
+    kwargs: dict[str, Any] = {"task_name": task["task"]}
+    for field in _CLOUD_GENERATOR_OPTIONAL_FIELDS:
+        value = task_options.get(field, _MISSING)
+        if value is not _MISSING:
+            kwargs[field] = value
+
+    batch_size = task.get("batch_size")
+    if batch_size is None:
+        priority = task_options.get("priority", _PRIORITY_MEDIUM)
+        batch_size = (
+            CLOUD_GENERATOR_BATCH_SIZE_HIGH_PRIORITY
+            if priority <= _PRIORITY_HIGH
+            else CLOUD_GENERATOR_BATCH_SIZE_DEFAULT
+        )
+    kwargs["batch_size"] = batch_size
+
+    # constant options for cloud beat task generators,
+    # everything else depends on the original task.
+    # the generated name is interned since beat keys its schedule by it on every tick
+    return BeatTaskSpec(
+        name=sys.intern(f"{ONYX_CLOUD_CELERY_TASK_PREFIX}_{task['name']}"),
+        task=OnyxCeleryTask.CLOUD_BEAT_TASK_GENERATOR,
+        schedule_seconds=task["schedule"].total_seconds(),
+        priority=_PRIORITY_HIGHEST,
+        expires=BEAT_EXPIRES_DEFAULT,
+        kwargs=kwargs,
+    )
 
 
 # tasks that only run in the cloud and are system wide
@@ -204,7 +275,7 @@ beat_cloud_tasks: list[dict] = [
         "schedule": timedelta(hours=1),
         "options": {
             "queue": OnyxCeleryQueues.MONITORING,
-            "priority": OnyxCeleryPriority.HIGH,
+            "priority": _PRIORITY_HIGH,
             "expires": BEAT_EXPIRES_DEFAULT,
         },
     },
@@ -214,7 +285,7 @@ beat_cloud_tasks: list[dict] = [
         "schedule": timedelta(seconds=30),
         "options": {
             "queue": OnyxCeleryQueues.MONITORING,
-            "priority": OnyxCeleryPriority.HIGH,
+            "priority": _PRIORITY_HIGH,
             "expires": BEAT_EXPIRES_DEFAULT,
         },
     },
@@ -224,7 +295,7 @@ beat_cloud_tasks: list[dict] = [
         "schedule": timedelta(minutes=10),
         "options": {
             "queue": OnyxCeleryQueues.MONITORING,
-            "priority": OnyxCeleryPriority.HIGH,
+            "priority": _PRIORITY_HIGH,
             "expires": BEAT_EXPIRES_DEFAULT,
         },
     },
@@ -234,89 +305,132 @@ beat_cloud_tasks: list[dict] = [
         "schedule": timedelta(hours=4),
         "options": {
             "queue": OnyxCeleryQueues.MONITORING,
-            "priority": OnyxCeleryPriority.HIGH,
+            "priority": _PRIORITY_HIGH,
             "expires": BEAT_EXPIRES_DEFAULT,
         },
     },
 ]
 
 # tasks that only run self hosted
-tasks_to_schedule: list[dict] = []
-if not MULTI_TENANT:
-    tasks_to_schedule.extend(
-        [
-            {
-                "name": "monitor-celery-queues",
-                "task": OnyxCeleryTask.MONITOR_CELERY_QUEUES,
-                "schedule": timedelta(seconds=10),
-                "options": {
-                    "priority": OnyxCeleryPriority.MEDIUM,
-                    "expires": BEAT_EXPIRES_DEFAULT,
-                    "queue": OnyxCeleryQueues.MONITORING,
-                },
-            },
-            {
-                "name": "monitor-process-memory",
-                "task": OnyxCeleryTask.MONITOR_PROCESS_MEMORY,
-                "schedule": timedelta(minutes=5),
-                "options": {
-                    "priority": OnyxCeleryPriority.LOW,
-                    "expires": BEAT_EXPIRES_DEFAULT,
-                    "queue": OnyxCeleryQueues.MONITORING,
-                },
-            },
-            {
-                "name": "celery-beat-heartbeat",
-                "task": OnyxCeleryTask.CELERY_BEAT_HEARTBEAT,
-                "schedule": timedelta(minutes=1),
-                "options": {
-                    "priority": OnyxCeleryPriority.HIGHEST,
-                    "expires": BEAT_EXPIRES_DEFAULT,
-                    "queue": OnyxCeleryQueues.PRIMARY,
-                },
-            },
-        ]
-    )
+_SELF_HOSTED_ONLY_TASKS: tuple[dict, ...] = (
+    {
+        "name": "monitor-celery-queues",
+        "task": OnyxCeleryTask.MONITOR_CELERY_QUEUES,
+        "schedule": timedelta(seconds=10),
+        "options": {
+            "priority": _PRIORITY_MEDIUM,
+            "expires": BEAT_EXPIRES_DEFAULT,
+            "queue": OnyxCeleryQueues.MONITORING,
+        },
+    },
+    {
+        "name": "monitor-process-memory",
+        "task": OnyxCeleryTask.MONITOR_PROCESS_MEMORY,
+        "schedule": timedelta(minutes=5),
+        "options": {
+            "priority": _PRIORITY_LOW,
+            "expires": BEAT_EXPIRES_DEFAULT,
+            "queue": OnyxCeleryQueues.MONITORING,
+        },
+    },
+    {
+        "name": "celery-beat-heartbeat",
+        "task": OnyxCeleryTask.CELERY_BEAT_HEARTBEAT,
+        "schedule": timedelta(minutes=1),
+        "options": {
+            "priority": _PRIORITY_HIGHEST,
+            "expires": BEAT_EXPIRES_DEFAULT,
+            "queue": OnyxCeleryQueues.PRIMARY,
+        },
+    },
+)
 
-    tasks_to_schedule.extend(beat_task_templates)
+tasks_to_schedule: list[dict] = (
+    [] if MULTI_TENANT else list(chain(_SELF_HOSTED_ONLY_TASKS, beat_task_templates))
+)
 
+# The derived schedules below are only needed by the beat process, while this module
+# is also imported by workers and the api server for its constants. Build them on
+# first use rather than at import; after that they never change.
+
+
+@functools.cache
+def _build_tasks_to_schedule_frozen() -> tuple[Mapping[str, Any], ...]:
+    # every beat tick gets the same read-only entries back.
+    # "options" stays a plain dict because beat pickles it into its persistent
+    # schedule and MappingProxyType can't be pickled.
+    return tuple(MappingProxyType({**task}) for task in tasks_to_schedule)
+
+
+class CloudTaskSchedule:
+    """The cloud beat schedule for a fixed set of system wide tasks and per tenant
+    templates. The EE schedule builds its own instance over the EE + base lists, so
+    both editions share the same precomputed generator specs.
 
-def generate_cloud_tasks(
-    beat_tasks: list[dict], beat_templates: list[dict], beat_multiplier: float
-) -> list[dict[str, Any]]:
-    """
     beat_tasks: system wide tasks that can be sent as is
     beat_templates: task templates that will be transformed into per tenant tasks via
     the cloud_beat_task_generator
-    beat_multiplier: a multiplier that can be applied on top of the task schedule
-    to speed up or slow down the task generation rate. useful in production.
-
-    Returns a list of cloud tasks, which consists of incoming tasks + tasks generated
-    from incoming templates.
     """
 
-    if beat_multiplier <= 0:
-        raise ValueError("beat_multiplier must be positive!")
+    def __init__(
+        self, beat_tasks: Sequence[dict], beat_templates: Sequence[dict]
+    ) -> None:
+        self._beat_tasks = tuple(beat_tasks)
+        self._beat_templates = tuple(beat_templates)
+        self._generator_specs: tuple[BeatTaskSpec, ...] | None = None
+        # the schedule is a pure function of the lists above and the multiplier, and
+        # only the multiplier changes at runtime (via redis). Keep the last result
+        # and hand it back until the multiplier actually changes. Entries are
+        # read-only views so the shared result can't be mutated by a caller.
+        self._last_beat_multiplier: float | None = None
+        self._last_cloud_tasks: tuple[Mapping[str, Any], ...] = ()
+
+    def _get_generator_specs(self) -> tuple[BeatTaskSpec, ...]:
+        # built on first use rather than at import, then only rescaled per call.
+        # Entries returned by get share their "kwargs" dicts with these specs.
+        if self._generator_specs is None:
+            self._generator_specs = tuple(
+                make_cloud_generator_task(beat_template)
+                for beat_template in self._beat_templates
+            )
+        return self._generator_specs
+
+    def get(self, beat_multiplier: float) -> tuple[Mapping[str, Any], ...]:
+        """beat_multiplier: a multiplier that can be applied on top of the task
+        schedule to speed up or slow down the task generation rate. useful in
+        production.
+
+        Returns the cloud tasks, which consists of tasks generated from the
+        templates + the system wide tasks."""
+        if beat_multiplier == self._last_beat_multiplier:
+            return self._last_cloud_tasks
+
+        if beat_multiplier <= 0:
+            raise ValueError("beat_multiplier must be positive!")
+
+        cloud_tasks = [
+            cloud_task.to_beat_task(beat_multiplier)
+            for cloud_task in self._get_generator_specs()
+        ]
 
-    cloud_tasks: list[dict] = []
+        # the fixed cloud/system beat tasks are sent as is. No multiplier for these.
+        cloud_tasks.extend(self._beat_tasks)
 
-    # generate our tenant aware cloud tasks from the templates
-    for beat_template in beat_templates:
-        cloud_task = make_cloud_generator_task(beat_template)
-        cloud_tasks.append(cloud_task)
+        self._last_cloud_tasks = tuple(
+            MappingProxyType(cloud_task) for cloud_task in cloud_tasks
+        )
+        self._last_beat_multiplier = beat_multiplier
+        return self._last_cloud_tasks
 
-    # factor in the cloud multiplier for the above
-    for cloud_task in cloud_tasks:
-        cloud_task["schedule"] = cloud_task["schedule"] * beat_multiplier
 
-    # add the fixed cloud/system beat tasks. No multiplier for these.
-    cloud_tasks.extend(copy.deepcopy(beat_tasks))
-    return cloud_tasks
+_cloud_task_schedule = CloudTaskSchedule(beat_cloud_tasks, beat_task_templates)
 
 
-def get_cloud_tasks_to_schedule(beat_multiplier: float) -> list[dict[str, Any]]:
-    return generate_cloud_tasks(beat_cloud_tasks, beat_task_templates, beat_multiplier)
+def get_cloud_tasks_to_schedule(
+    beat_multiplier: float,
+) -> tuple[Mapping[str, Any], ...]:
+    return _cloud_task_schedule.get(beat_multiplier)
 
 
-def get_tasks_to_schedule() -> list[dict[str, Any]]:
-    return tasks_to_schedule
+def get_tasks_to_schedule() -> tuple[Mapping[str, Any], ...]:
+    return _build_tasks_to_schedule_frozen()
@@ -1,11 +1,17 @@
+import errno
+import json
 import multiprocessing
 import os
+import random
+import re
 import time
 import traceback
 from datetime import datetime
 from datetime import timezone
 from enum import Enum
 from http import HTTPStatus
+from itertools import chain
+from multiprocessing.connection import wait as wait_for_ready
 from time import sleep
 from typing import Any
 from typing import cast
@@ -18,6 +24,7 @@ from celery.result import AsyncResult
 from celery.states import READY_STATES
 from pydantic import BaseModel
 from redis import Redis
+from redis.client import PubSub
 from redis.lock import Lock as RedisLock
 from sqlalchemy.orm import Session
 
@@ -39,6 +46,7 @@ from onyx.background.indexing.job_client import SimpleJob
 from onyx.background.indexing.job_client import SimpleJobClient
 from onyx.background.indexing.job_client import SimpleJobException
 from onyx.background.indexing.run_indexing import run_indexing_entrypoint
+from onyx.configs.app_configs import INDEXING_CHILD_USE_FORKSERVER
 from onyx.configs.app_configs import MANAGED_VESPA
 from onyx.configs.app_configs import VESPA_CLOUD_CERT_PATH
 from onyx.configs.app_configs import VESPA_CLOUD_KEY_PATH
@@ -56,7 +64,8 @@ from onyx.connectors.exceptions import ConnectorValidationError
 from onyx.db.connector import mark_ccpair_with_indexing_trigger
 from onyx.db.connector_credential_pair import fetch_connector_credential_pairs
 from onyx.db.connector_credential_pair import get_connector_credential_pair_from_id
-from onyx.db.connector_credential_pair import set_cc_pair_repeated_error_state
+from onyx.db.connector_credential_pair import get_connector_credential_pairs
+from onyx.db.connector_credential_pair import set_cc_pairs_repeated_error_state
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
 from onyx.db.enums import ConnectorCredentialPairStatus
 from onyx.db.enums import IndexingMode
@@ -64,6 +73,7 @@ from onyx.db.enums import IndexingStatus
 from onyx.db.index_attempt import get_index_attempt
 from onyx.db.index_attempt import mark_attempt_canceled
 from onyx.db.index_attempt import mark_attempt_failed
+from onyx.db.models import ConnectorCredentialPair
 from onyx.db.search_settings import get_active_search_settings_list
 from onyx.db.search_settings import get_current_search_settings
 from onyx.db.swap_index import check_and_perform_index_swap
@@ -74,9 +84,11 @@ from onyx.redis.redis_connector_index import RedisConnectorIndex
 from onyx.redis.redis_pool import get_redis_client
 from onyx.redis.redis_pool import get_redis_replica_client
 from onyx.redis.redis_pool import redis_lock_dump
+from onyx.redis.redis_pool import release_lock_if_owned
 from onyx.redis.redis_pool import SCAN_ITER_COUNT_DEFAULT
-from onyx.redis.redis_utils import is_fence
+from onyx.redis.redis_utils import FENCE_SCAN_PATTERNS
 from onyx.server.runtime.onyx_runtime import OnyxRuntime
+from onyx.utils.batching import batch_generator
 from onyx.utils.logger import setup_logger
 from onyx.utils.variable_functionality import global_version
 from shared_configs.configs import INDEXING_MODEL_SERVER_HOST
@@ -86,6 +98,33 @@ from shared_configs.configs import SENTRY_DSN
 
 logger = setup_logger()
 
+# how many scanned fence keys are added to the lookup table per SADD
+_FENCE_LOOKUP_TABLE_BATCH_SIZE = 500
+
+_INDEX_FENCE_PREFIX_BYTES = RedisConnectorIndex.FENCE_PREFIX.encode("utf-8")
+# connectorindexing_fence_<cc_pair_id>/<search_settings_id>, matched on the raw bytes
+_INDEX_FENCE_KEY_RE = re.compile(
+    re.escape(_INDEX_FENCE_PREFIX_BYTES) + rb"_(\d+)/(\d+)$"
+)
+
+# SSCAN COUNT hint for ACTIVE_FENCES, also the number of fences checked per pipeline
+_ACTIVE_FENCES_SCAN_COUNT = 500
+
+# backoff (in seconds) used by the spawned task while waiting for its fence to be
+# finalized. jitter keeps many simultaneously spawned tasks from polling in lockstep.
+_FENCE_WAIT_BASE_DELAY = 0.05
+_FENCE_WAIT_MAX_DELAY = 2.0
+_FENCE_WAIT_JITTER = 0.1
+
+# how often the watchdog renews its signals when no events arrive
+_WATCHDOG_HEARTBEAT_INTERVAL = 5.0
+
+# how often the watchdog checks for indexing events while waiting on the process
+_INDEXING_EVENT_POLL_INTERVAL = 0.25
+
+# returned by _wait_for_indexing_event when the spawned process exits
+_PROCESS_EXITED = "process_exited"
+
 
 def _get_fence_validation_block_expiration() -> int:
     """
@@ -152,42 +191,32 @@ class IndexingWatchdogTerminalStatus(str, Enum):
 
     @property
     def code(self) -> int:
-        _ENUM_TO_CODE: dict[IndexingWatchdogTerminalStatus, int] = {
-            IndexingWatchdogTerminalStatus.PROCESS_SIGNAL_SIGKILL: -9,
-            IndexingWatchdogTerminalStatus.OUT_OF_MEMORY: 137,
-            IndexingWatchdogTerminalStatus.CONNECTOR_VALIDATION_ERROR: 247,
-            IndexingWatchdogTerminalStatus.BLOCKED_BY_DELETION: 248,
-            IndexingWatchdogTerminalStatus.BLOCKED_BY_STOP_SIGNAL: 249,
-            IndexingWatchdogTerminalStatus.FENCE_NOT_FOUND: 250,
-            IndexingWatchdogTerminalStatus.FENCE_READINESS_TIMEOUT: 251,
-            IndexingWatchdogTerminalStatus.FENCE_MISMATCH: 252,
-            IndexingWatchdogTerminalStatus.TASK_ALREADY_RUNNING: 253,
-            IndexingWatchdogTerminalStatus.INDEX_ATTEMPT_MISMATCH: 254,
-            IndexingWatchdogTerminalStatus.CONNECTOR_EXCEPTIONED: 255,
-        }
-
         return _ENUM_TO_CODE[self]
 
     @classmethod
     def from_code(cls, code: int) -> "IndexingWatchdogTerminalStatus":
-        _CODE_TO_ENUM: dict[int, IndexingWatchdogTerminalStatus] = {
-            -9: IndexingWatchdogTerminalStatus.PROCESS_SIGNAL_SIGKILL,
-            137: IndexingWatchdogTerminalStatus.OUT_OF_MEMORY,
-            247: IndexingWatchdogTerminalStatus.CONNECTOR_VALIDATION_ERROR,
-            248: IndexingWatchdogTerminalStatus.BLOCKED_BY_DELETION,
-            249: IndexingWatchdogTerminalStatus.BLOCKED_BY_STOP_SIGNAL,
-            250: IndexingWatchdogTerminalStatus.FENCE_NOT_FOUND,
-            251: IndexingWatchdogTerminalStatus.FENCE_READINESS_TIMEOUT,
-            252: IndexingWatchdogTerminalStatus.FENCE_MISMATCH,
-            253: IndexingWatchdogTerminalStatus.TASK_ALREADY_RUNNING,
-            254: IndexingWatchdogTerminalStatus.INDEX_ATTEMPT_MISMATCH,
-            255: IndexingWatchdogTerminalStatus.CONNECTOR_EXCEPTIONED,
-        }
-
-        if code in _CODE_TO_ENUM:
-            return _CODE_TO_ENUM[code]
-
-        return IndexingWatchdogTerminalStatus.UNDEFINED
+        return _CODE_TO_ENUM.get(code, IndexingWatchdogTerminalStatus.UNDEFINED)
+
+
+# built once at import rather than on every code / from_code call
+_ENUM_TO_CODE: dict[IndexingWatchdogTerminalStatus, int] = {
+    IndexingWatchdogTerminalStatus.PROCESS_SIGNAL_SIGKILL: -9,
+    IndexingWatchdogTerminalStatus.OUT_OF_MEMORY: 137,
+    IndexingWatchdogTerminalStatus.CONNECTOR_VALIDATION_ERROR: 247,
+    IndexingWatchdogTerminalStatus.BLOCKED_BY_DELETION: 248,
+    IndexingWatchdogTerminalStatus.BLOCKED_BY_STOP_SIGNAL: 249,
+    IndexingWatchdogTerminalStatus.FENCE_NOT_FOUND: 250,
+    IndexingWatchdogTerminalStatus.FENCE_READINESS_TIMEOUT: 251,
+    IndexingWatchdogTerminalStatus.FENCE_MISMATCH: 252,
+    IndexingWatchdogTerminalStatus.TASK_ALREADY_RUNNING: 253,
+    IndexingWatchdogTerminalStatus.INDEX_ATTEMPT_MISMATCH: 254,
+    IndexingWatchdogTerminalStatus.CONNECTOR_EXCEPTIONED: 255,
+}
+
+# derived so the two tables can't drift apart
+_CODE_TO_ENUM: dict[int, IndexingWatchdogTerminalStatus] = {
+    code: status for status, code in _ENUM_TO_CODE.items()
+}
 
 
 class SimpleJobResult:
@@ -216,55 +245,62 @@ class ConnectorIndexingLogBuilder:
     def __init__(self, ctx: ConnectorIndexingContext):
         self.ctx = ctx
 
-    def build(self, msg: str, **kwargs: Any) -> str:
-        msg_final = (
-            f"{msg}: "
-            f"tenant_id={self.ctx.tenant_id} "
-            f"attempt={self.ctx.index_attempt_id} "
-            f"cc_pair={self.ctx.cc_pair_id} "
-            f"search_settings={self.ctx.search_settings_id}"
+        # the context doesn't change, so build the common logfmt suffix once
+        self._prefix = (
+            f"tenant_id={ctx.tenant_id} "
+            f"attempt={ctx.index_attempt_id} "
+            f"cc_pair={ctx.cc_pair_id} "
+            f"search_settings={ctx.search_settings_id}"
         )
 
-        # Append extra keyword arguments in logfmt style
-        if kwargs:
-            extra_logfmt = " ".join(f"{key}={value}" for key, value in kwargs.items())
-            msg_final = f"{msg_final} {extra_logfmt}"
+    def build(self, msg: str, **kwargs: Any) -> str:
+        if not kwargs:
+            return f"{msg}: {self._prefix}"
 
-        return msg_final
+        # Append extra keyword arguments in logfmt style
+        extra_logfmt = " ".join(f"{key}={value}" for key, value in kwargs.items())
+        return f"{msg}: {self._prefix} {extra_logfmt}"
 
 
-def monitor_ccpair_indexing_taskset(
-    tenant_id: str, key_bytes: bytes, r: Redis, db_session: Session
-) -> None:
-    # if the fence doesn't exist, there's nothing to do
-    fence_key = key_bytes.decode("utf-8")
-    composite_id = RedisConnector.get_id_from_fence_key(fence_key)
-    if composite_id is None:
+def parse_indexing_fence_key(key_bytes: bytes) -> tuple[int, int] | None:
+    """Returns (cc_pair_id, search_settings_id) for an indexing fence key,
+    or None if the key can't be parsed."""
+    match = _INDEX_FENCE_KEY_RE.match(key_bytes)
+    if match is None:
         task_logger.warning(
-            f"Connector indexing: could not parse composite_id from {fence_key}"
+            f"Connector indexing: could not parse composite_id from {key_bytes!r}"
         )
-        return
+        return None
 
-    # parse out metadata and initialize the helper class with it
-    parts = composite_id.split("/")
-    if len(parts) != 2:
-        return
+    return int(match.group(1)), int(match.group(2))
 
-    cc_pair_id = int(parts[0])
-    search_settings_id = int(parts[1])
 
+def monitor_ccpair_indexing_taskset(
+    tenant_id: str,
+    cc_pair_id: int,
+    search_settings_id: int,
+    cc_pair: ConnectorCredentialPair | None,
+    r: Redis,
+    db_session: Session,
+    now: datetime | None = None,
+) -> None:
+    """cc_pair is preloaded by the caller (in db_session) so that all fences can
+    share a single bulk lookup. now lets the caller share one timestamp across
+    every fence it monitors."""
+    now = now or datetime.now(timezone.utc)
+
+    # if the fence doesn't exist, there's nothing to do
     redis_connector = RedisConnector(tenant_id, cc_pair_id)
     redis_connector_index = redis_connector.new_index(search_settings_id)
-    if not redis_connector_index.fenced:
-        return
 
-    payload = redis_connector_index.payload
+    # read everything we need to make a decision in one round trip
+    snapshot = redis_connector_index.snapshot()
+    payload = snapshot.payload
     if not payload:
         return
 
     # if the CC Pair is `SCHEDULED`, moved it to `INITIAL_INDEXING`. A CC Pair
     # should only ever be `SCHEDULED` if it's a new connector.
-    cc_pair = get_connector_credential_pair_from_id(db_session, cc_pair_id)
     if cc_pair is None:
         raise RuntimeError(f"CC Pair {cc_pair_id} not found")
 
@@ -274,12 +310,12 @@ def monitor_ccpair_indexing_taskset(
 
     elapsed_started_str = None
     if payload.started:
-        elapsed_started = datetime.now(timezone.utc) - payload.started
+        elapsed_started = now - payload.started
         elapsed_started_str = f"{elapsed_started.total_seconds():.2f}"
 
-    elapsed_submitted = datetime.now(timezone.utc) - payload.submitted
+    elapsed_submitted = now - payload.submitted
 
-    progress = redis_connector_index.get_progress()
+    progress = snapshot.progress
     if progress is not None:
         task_logger.info(
             f"Connector indexing progress: "
@@ -304,7 +340,7 @@ def monitor_ccpair_indexing_taskset(
     # Verify: if the generator isn't complete, the task must not be in READY state
     # inner = get_completion / generator_complete not signaled
     # outer = result.state in READY state
-    status_int = redis_connector_index.get_completion()
+    status_int = snapshot.completion
     if status_int is None:  # inner signal not set ... possible error
         task_state = result.state
         if (
@@ -357,7 +393,7 @@ def monitor_ccpair_indexing_taskset(
                 redis_connector_index.reset()
         return
 
-    if redis_connector_index.watchdog_signaled():
+    if snapshot.watchdog_signaled:
         # if the generator is complete, don't clean up until the watchdog has exited
         task_logger.info(
             f"Connector indexing - Delaying finalization until watchdog has exited: "
@@ -390,18 +426,27 @@ def monitor_ccpair_indexing_taskset(
     # CC Pair is not active not already
     # This should never technically be in this state, but we'll handle it anyway
     index_attempt = get_index_attempt(db_session, payload.index_attempt_id)
-    index_attempt_is_successful = index_attempt and index_attempt.status.is_successful()
-    if (
-        index_attempt_is_successful
-        and cc_pair.status == ConnectorCredentialPairStatus.SCHEDULED
-        or cc_pair.status == ConnectorCredentialPairStatus.INITIAL_INDEXING
+    index_attempt_is_successful = bool(
+        index_attempt and index_attempt.status.is_successful()
+    )
+    if not index_attempt_is_successful:
+        return
+
+    cc_pair_changed = False
+    if cc_pair.status in (
+        ConnectorCredentialPairStatus.SCHEDULED,
+        ConnectorCredentialPairStatus.INITIAL_INDEXING,
     ):
         cc_pair.status = ConnectorCredentialPairStatus.ACTIVE
-        db_session.commit()
+        cc_pair_changed = True
 
     # if the index attempt is successful, clear the repeated error state
-    if cc_pair.in_repeated_error_state and index_attempt_is_successful:
+    if cc_pair.in_repeated_error_state:
         cc_pair.in_repeated_error_state = False
+        cc_pair_changed = True
+
+    # only commit when something actually changed, and at most once
+    if cc_pair_changed:
         db_session.commit()
 
 
@@ -447,15 +492,27 @@ def check_for_indexing(self: Task, *, tenant_id: str) -> int | None:
             task_logger.info("check_for_indexing - Starting Redis scan for fence lookup table")
             start_time = time.time()
             fence_count = 0
-            for key_bytes in redis_client_replica.scan_iter(
-                count=SCAN_ITER_COUNT_DEFAULT
+            # MATCH filters server side, so only fence keys come back over the wire
+            fence_keys = chain.from_iterable(
+                redis_client_replica.scan_iter(
+                    match=fence_pattern, count=SCAN_ITER_COUNT_DEFAULT
+                )
+                for fence_pattern in FENCE_SCAN_PATTERNS
+            )
+            # SADD is idempotent and returns how many members were actually new,
+            # so there's no need to check membership key by key first
+            for fence_key_batch in batch_generator(
+                fence_keys, _FENCE_LOOKUP_TABLE_BATCH_SIZE
             ):
-                if is_fence(key_bytes) and not redis_client.sismember(
-                    OnyxRedisConstants.ACTIVE_FENCES, key_bytes
-                ):
-                    logger.warning(f"Adding {key_bytes} to the lookup table.")
-                    redis_client.sadd(OnyxRedisConstants.ACTIVE_FENCES, key_bytes)
-                    fence_count += 1
+                num_added = cast(
+                    int,
+                    redis_client.sadd(
+                        OnyxRedisConstants.ACTIVE_FENCES, *fence_key_batch
+                    ),
+                )
+                if num_added:
+                    logger.warning(f"Added {num_added} fences to the lookup table.")
+                    fence_count += num_added
             end_time = time.time()
             task_logger.info(f"check_for_indexing - Redis scan completed: {end_time - start_time:.2f} seconds, processed {fence_count} fences")
 
@@ -467,8 +524,11 @@ def check_for_indexing(self: Task, *, tenant_id: str) -> int | None:
 
         # 1/3: KICKOFF
 
-        # check for search settings swap
+        # the swap check, cc pair gathering and repeated error marking share one
+        # session (and one lookup of the current search settings)
+        cc_pair_ids: list[int] = []
         with get_session_with_current_tenant() as db_session:
+            # check for search settings swap
             old_search_settings = check_and_perform_index_swap(db_session=db_session)
             current_search_settings = get_current_search_settings(db_session)
             # So that the first time users aren't surprised by really slow speed of first
@@ -486,10 +546,8 @@ def check_for_indexing(self: Task, *, tenant_id: str) -> int | None:
                         embedding_model=embedding_model,
                     )
 
-        # gather cc_pair_ids
-        lock_beat.reacquire()
-        cc_pair_ids: list[int] = []
-        with get_session_with_current_tenant() as db_session:
+            # gather cc_pair_ids
+            lock_beat.reacquire()
             cc_pairs = fetch_connector_credential_pairs(
                 db_session, include_user_files=True
             )
@@ -511,28 +569,61 @@ def check_for_indexing(self: Task, *, tenant_id: str) -> int | None:
             filtered_cc_pairs = cc_pairs
             cc_pair_ids = [cc_pair.id for cc_pair in filtered_cc_pairs]
 
-        # mark CC Pairs that are repeatedly failing as in repeated error state
-        with get_session_with_current_tenant() as db_session:
-            current_search_settings = get_current_search_settings(db_session)
-            for cc_pair_id in cc_pair_ids:
+            # mark CC Pairs that are repeatedly failing as in repeated error state
+            repeated_error_cc_pair_ids = [
+                cc_pair_id
+                for cc_pair_id in cc_pair_ids
                 if is_in_repeated_error_state(
                     cc_pair_id=cc_pair_id,
                     search_settings_id=current_search_settings.id,
                     db_session=db_session,
-                ):
-                    set_cc_pair_repeated_error_state(
-                        db_session=db_session,
-                        cc_pair_id=cc_pair_id,
-                        in_repeated_error_state=True,
-                    )
+                )
+            ]
+            set_cc_pairs_repeated_error_state(
+                db_session=db_session,
+                cc_pair_ids=repeated_error_cc_pair_ids,
+                in_repeated_error_state=True,
+            )
+
+            # search settings rarely change within a beat, so load them once here
+            # instead of once per cc pair. sessions don't expire on commit, so the
+            # loaded attributes stay usable after this session closes.
+            search_settings_list = get_active_search_settings_list(db_session)
 
         # kick off index attempts
+        # reacquiring is a redis round trip, so only refresh the lock periodically
+        # rather than on every iteration
+        lock_beat.reacquire()
+        last_lock_time = time.monotonic()
         for cc_pair_id in cc_pair_ids:
-            lock_beat.reacquire()
+            current_time = time.monotonic()
+            if current_time - last_lock_time >= (CELERY_GENERIC_BEAT_LOCK_TIMEOUT / 4):
+                lock_beat.reacquire()
+                last_lock_time = current_time
 
             redis_connector = RedisConnector(tenant_id, cc_pair_id)
             with get_session_with_current_tenant() as db_session:
-                search_settings_list = get_active_search_settings_list(db_session)
+                # a swap mid beat changes the current search settings, in which
+                # case the preloaded list is stale and has to be reloaded
+                if (
+                    get_current_search_settings(db_session).id
+                    != search_settings_list[0].id
+                ):
+                    search_settings_list = get_active_search_settings_list(db_session)
+
+                # the cc pair is the same for every search settings instance,
+                # so fetch it once rather than per iteration
+                cc_pair = get_connector_credential_pair_from_id(
+                    db_session=db_session,
+                    cc_pair_id=cc_pair_id,
+                )
+                if not cc_pair:
+                    task_logger.warning(
+                        f"check_for_indexing - CC pair not found: cc_pair={cc_pair_id}"
+                    )
+                    continue
+
+                secondary_index_building = len(search_settings_list) > 1
                 for search_settings_instance in search_settings_list:
                     # skip non-live search settings that don't have background reindex enabled
                     # those should just auto-change to live shortly after creation without
@@ -550,38 +641,34 @@ def check_for_indexing(self: Task, *, tenant_id: str) -> int | None:
                     )
                     if redis_connector_index.fenced:
                         task_logger.debug(
-                            f"check_for_indexing - Skipping fenced connector: "
-                            f"cc_pair={cc_pair_id} search_settings={search_settings_instance.id}"
-                        )
-                        continue
-
-                    cc_pair = get_connector_credential_pair_from_id(
-                        db_session=db_session,
-                        cc_pair_id=cc_pair_id,
-                    )
-                    if not cc_pair:
-                        task_logger.warning(
-                            f"check_for_indexing - CC pair not found: cc_pair={cc_pair_id}"
+                            "check_for_indexing - Skipping fenced connector: "
+                            "cc_pair=%s search_settings=%s",
+                            cc_pair_id,
+                            search_settings_instance.id,
                         )
                         continue
 
                     if not should_index(
                         cc_pair=cc_pair,
                         search_settings_instance=search_settings_instance,
-                        secondary_index_building=len(search_settings_list) > 1,
+                        secondary_index_building=secondary_index_building,
                         db_session=db_session,
                     ):
                         task_logger.debug(
-                            f"check_for_indexing - Not indexing cc_pair_id: {cc_pair_id} "
-                            f"search_settings={search_settings_instance.id}, "
-                            f"secondary_index_building={len(search_settings_list) > 1}"
+                            "check_for_indexing - Not indexing cc_pair_id: %s "
+                            "search_settings=%s, secondary_index_building=%s",
+                            cc_pair_id,
+                            search_settings_instance.id,
+                            secondary_index_building,
                         )
                         continue
                     else:
                         task_logger.debug(
-                            f"check_for_indexing - Will index cc_pair_id: {cc_pair_id} "
-                            f"search_settings={search_settings_instance.id}, "
-                            f"secondary_index_building={len(search_settings_list) > 1}"
+                            "check_for_indexing - Will index cc_pair_id: %s "
+                            "search_settings=%s, secondary_index_building=%s",
+                            cc_pair_id,
+                            search_settings_instance.id,
+                            secondary_index_building,
                         )
 
                     reindex = False
@@ -639,8 +726,14 @@ def check_for_indexing(self: Task, *, tenant_id: str) -> int | None:
                 db_session, redis_client
             )
 
+            last_lock_time = time.monotonic()
             for attempt_id in unfenced_attempt_ids:
-                lock_beat.reacquire()
+                current_time = time.monotonic()
+                if current_time - last_lock_time >= (
+                    CELERY_GENERIC_BEAT_LOCK_TIMEOUT / 4
+                ):
+                    lock_beat.reacquire()
+                    last_lock_time = current_time
 
                 attempt = get_index_attempt(db_session, attempt_id)
                 if not attempt:
@@ -678,21 +771,62 @@ def check_for_indexing(self: Task, *, tenant_id: str) -> int | None:
 
         # 3/3: FINALIZE
         lock_beat.reacquire()
-        keys = cast(
-            set[Any], redis_client_replica.smembers(OnyxRedisConstants.ACTIVE_FENCES)
-        )
-        for key in keys:
-            key_bytes = cast(bytes, key)
+        # walk the lookup table incrementally rather than pulling the whole set in
+        # one reply. SSCAN can return a member more than once, hence the dict.
+        indexing_fences: dict[tuple[int, int], None] = {}
+        for fence_key_batch in batch_generator(
+            redis_client_replica.sscan_iter(
+                OnyxRedisConstants.ACTIVE_FENCES, count=_ACTIVE_FENCES_SCAN_COUNT
+            ),
+            _ACTIVE_FENCES_SCAN_COUNT,
+        ):
+            fence_keys = [cast(bytes, key) for key in fence_key_batch]
+
+            # check the batch in one round trip and drop the dead ones in one SREM
+            exists_pipe = redis_client.pipeline(transaction=False)
+            for key_bytes in fence_keys:
+                exists_pipe.exists(key_bytes)
+            fence_exists = exists_pipe.execute()
+
+            dead_fence_keys = [
+                key_bytes
+                for key_bytes, exists in zip(fence_keys, fence_exists)
+                if not exists
+            ]
+            if dead_fence_keys:
+                redis_client.srem(OnyxRedisConstants.ACTIVE_FENCES, *dead_fence_keys)
+
+            for key_bytes, exists in zip(fence_keys, fence_exists):
+                if not exists:
+                    continue
 
-            if not redis_client.exists(key_bytes):
-                redis_client.srem(OnyxRedisConstants.ACTIVE_FENCES, key_bytes)
-                continue
+                if key_bytes.startswith(_INDEX_FENCE_PREFIX_BYTES):
+                    fence_ids = parse_indexing_fence_key(key_bytes)
+                    if fence_ids is not None:
+                        indexing_fences[fence_ids] = None
 
-            key_str = key_bytes.decode("utf-8")
-            if key_str.startswith(RedisConnectorIndex.FENCE_PREFIX):
-                with get_session_with_current_tenant() as db_session:
+        if indexing_fences:
+            # load every cc pair referenced by a fence in one query and monitor all
+            # of the fences in a single session
+            with get_session_with_current_tenant() as db_session:
+                cc_pairs_by_id = {
+                    cc_pair.id: cc_pair
+                    for cc_pair in get_connector_credential_pairs(
+                        db_session,
+                        ids=list({cc_pair_id for cc_pair_id, _ in indexing_fences}),
+                        include_user_files=True,
+                    )
+                }
+                now = datetime.now(timezone.utc)
+                for cc_pair_id, search_settings_id in indexing_fences:
                     monitor_ccpair_indexing_taskset(
-                        tenant_id, key_bytes, redis_client_replica, db_session
+                        tenant_id,
+                        cc_pair_id,
+                        search_settings_id,
+                        cc_pairs_by_id.get(cc_pair_id),
+                        redis_client_replica,
+                        db_session,
+                        now=now,
                     )
 
     except SoftTimeLimitExceeded:
@@ -703,9 +837,7 @@ def check_for_indexing(self: Task, *, tenant_id: str) -> int | None:
         task_logger.exception("Unexpected exception during indexing check")
     finally:
         if locked:
-            if lock_beat.owned():
-                lock_beat.release()
-            else:
+            if not release_lock_if_owned(lock_beat):
                 task_logger.error(
                     "check_for_indexing - Lock not owned on completion: "
                     f"tenant={tenant_id}"
@@ -775,7 +907,10 @@ def connector_indexing_task(
 
     r = get_redis_client()
 
-    if redis_connector.delete.fenced:
+    # the deletion, stop and index fences are all read in one round trip
+    fences = redis_connector.snapshot_fences(search_settings_id)
+
+    if fences.delete_fenced:
         raise SimpleJobException(
             f"Indexing will not start because connector deletion is in progress: "
             f"attempt={index_attempt_id} "
@@ -784,7 +919,7 @@ def connector_indexing_task(
             code=IndexingWatchdogTerminalStatus.BLOCKED_BY_DELETION.code,
         )
 
-    if redis_connector.stop.fenced:
+    if fences.stop_fenced:
         raise SimpleJobException(
             f"Indexing will not start because a connector stop signal was detected: "
             f"attempt={index_attempt_id} "
@@ -797,6 +932,8 @@ def connector_indexing_task(
     # the primary worker sends the task and it is immediately executed
     # before the primary worker can finalize the fence
     start = time.monotonic()
+    num_waits = 0
+    payload = fences.index_payload
     while True:
         if time.monotonic() - start > CELERY_TASK_WAIT_FOR_FENCE_TIMEOUT:
             raise SimpleJobException(
@@ -805,24 +942,25 @@ def connector_indexing_task(
                 code=IndexingWatchdogTerminalStatus.FENCE_READINESS_TIMEOUT.code,
             )
 
-        if not redis_connector_index.fenced:  # The fence must exist
-            raise SimpleJobException(
-                f"connector_indexing_task - fence not found: fence={redis_connector_index.fence_key}",
-                code=IndexingWatchdogTerminalStatus.FENCE_NOT_FOUND.code,
-            )
-
-        payload = redis_connector_index.payload  # The payload must exist
+        # The fence must exist. a missing fence and a missing payload are the same
+        # thing, since the payload is the value of the fence key.
         if not payload:
             raise SimpleJobException(
-                "connector_indexing_task: payload invalid or not found",
+                f"connector_indexing_task - fence not found: fence={redis_connector_index.fence_key}",
                 code=IndexingWatchdogTerminalStatus.FENCE_NOT_FOUND.code,
             )
 
         if payload.index_attempt_id is None or payload.celery_task_id is None:
             logger.info(
-                f"connector_indexing_task - Waiting for fence: fence={redis_connector_index.fence_key}"
+                "connector_indexing_task - Waiting for fence: fence=%s",
+                redis_connector_index.fence_key,
             )
-            sleep(1)
+            sleep(
+                min(_FENCE_WAIT_MAX_DELAY, _FENCE_WAIT_BASE_DELAY * 2**num_waits)
+                + random.uniform(0, _FENCE_WAIT_JITTER)
+            )
+            num_waits += 1
+            payload = redis_connector_index.payload
             continue
 
         if payload.index_attempt_id != index_attempt_id:
@@ -943,19 +1081,15 @@ def connector_indexing_task(
             f"search_settings={search_settings_id}"
         )
 
-        # special bulletproofing ... truncate long exception messages
-        # for exception types that require more args, this will fail
-        # thus the try/except
-        try:
-            sanitized_e = type(e)(str(e)[:1024])
-            sanitized_e.__traceback__ = e.__traceback__
-            raise sanitized_e
-        except Exception:
-            raise e
+        # special bulletproofing ... truncate long exception messages.
+        # this is done in place since rebuilding the exception fails for
+        # exception types whose constructors take other args
+        if e.args and isinstance(e.args[0], str) and len(e.args[0]) > 1024:
+            e.args = (e.args[0][:1024], *e.args[1:])
+        raise
 
     finally:
-        if lock.owned():
-            lock.release()
+        release_lock_if_owned(lock)
 
     logger.info(
         f"Indexing spawned task finished: attempt={index_attempt_id} "
@@ -989,10 +1123,8 @@ def process_job_result(
     # work around this issue. Basically, we ignore the job error state
     # if the completion signal is OK.
     status_int = redis_connector_index.get_completion()
-    if status_int:
-        status_enum = HTTPStatus(status_int)
-        if status_enum == HTTPStatus.OK:
-            ignore_exitcode = True
+    if status_int == HTTPStatus.OK.value:
+        ignore_exitcode = True
 
     if ignore_exitcode:
         result.status = IndexingWatchdogTerminalStatus.SUCCEEDED
@@ -1012,6 +1144,48 @@ def process_job_result(
     return result
 
 
+def _is_broken_pipe(e: BaseException) -> bool:
+    return isinstance(e, (BrokenPipeError, ConnectionResetError)) or (
+        getattr(e, "errno", None) == errno.EPIPE
+    )
+
+
+def _wait_for_indexing_event(
+    pubsub: PubSub, process_sentinel: int, timeout: float
+) -> str | None:
+    """Blocks until an event is published on the indexing events channel, the spawned
+    process exits (process_sentinel becomes ready) or the timeout passes. Returns the
+    event, _PROCESS_EXITED if the process exited, or None if nothing happened.
+
+    Waits on the process in short slices and polls the channel in between, so both
+    are noticed within _INDEXING_EVENT_POLL_INTERVAL. Falls back to waiting on the
+    process alone if redis errors, since the watchdog needs to stay stable and the
+    events are only an optimization over polling."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            message = pubsub.get_message(ignore_subscribe_messages=True, timeout=0)
+        except Exception:
+            task_logger.exception("Indexing watchdog - exception waiting for events")
+            remaining = max(deadline - time.monotonic(), 0)
+            if wait_for_ready([process_sentinel], timeout=remaining):
+                return _PROCESS_EXITED
+            return None
+
+        if message:
+            data = message["data"]
+            return data.decode("utf-8") if isinstance(data, bytes) else str(data)
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+
+        if wait_for_ready(
+            [process_sentinel], timeout=min(remaining, _INDEXING_EVENT_POLL_INTERVAL)
+        ):
+            return _PROCESS_EXITED
+
+
 @shared_task(
     name=OnyxCeleryTask.CONNECTOR_INDEXING_PROXY_TASK,
     bind=True,
@@ -1061,7 +1235,9 @@ def connector_indexing_proxy_task(
     if not self.request.id:
         task_logger.error("self.request.id is None!")
 
-    client = SimpleJobClient()
+    client = SimpleJobClient(
+        start_method="forkserver" if INDEXING_CHILD_USE_FORKSERVER else "spawn"
+    )
     task_logger.info(f"submitting connector_indexing_task with tenant_id={tenant_id}")
 
     try:
@@ -1074,16 +1250,12 @@ def connector_indexing_proxy_task(
             tenant_id,
         )
     except Exception as e:
-        # Check for Broken pipe errors and OSErrors specifically during job submission
-        error_message = str(e).lower()
-        if ("broken pipe" in error_message or 
-            "errno 32" in error_message or 
-            isinstance(e, (BrokenPipeError, OSError))):
-            
-            # Log the broken pipe error for debugging
+        # spawning the process surfaces pipe and fork failures as OSError (broken
+        # pipes included, they are a subclass), so retry all of them
+        if isinstance(e, OSError):
             task_logger.warning(
                 log_builder.build(
-                    "Indexing watchdog - Broken pipe error during job submission",
+                    "Indexing watchdog - OS error during job submission",
                     error=str(e),
                     attempt=self.request.retries + 1,
                     max_retries=self.max_retries,
@@ -1097,7 +1269,7 @@ def connector_indexing_proxy_task(
                 
                 task_logger.info(
                     log_builder.build(
-                        "Indexing watchdog - Retrying due to broken pipe during submission",
+                        "Indexing watchdog - Retrying due to OS error during submission",
                         retry_attempt=self.request.retries + 1,
                         countdown=f"{countdown}s",
                     )
@@ -1108,7 +1280,7 @@ def connector_indexing_proxy_task(
             else:
                 task_logger.error(
                     log_builder.build(
-                        "Indexing watchdog - Max retries exceeded for broken pipe during submission",
+                        "Indexing watchdog - Max retries exceeded for OS error during submission",
                         final_attempt=self.request.retries + 1,
                     )
                 )
@@ -1165,7 +1337,13 @@ def connector_indexing_proxy_task(
     last_activity_ttl_observed: float = time.monotonic()
     last_activity_ttl: int = 0
 
+    # state changes (completion, termination) are published so the watchdog can
+    # react right away, the heartbeat interval is just the fallback
+    pubsub = redis_connector_index.redis.pubsub()
+
     try:
+        pubsub.subscribe(redis_connector_index.events_channel)
+
         with get_session_with_current_tenant() as db_session:
             index_attempt = get_index_attempt(
                 db_session=db_session, index_attempt_id=index_attempt_id
@@ -1177,21 +1355,32 @@ def connector_indexing_proxy_task(
                 index_attempt.connector_credential_pair.connector.source.value
             )
 
-        redis_connector_index.set_active()  # renew active signal
-
-        # prime the connector active signal (renewed inside the connector)
-        redis_connector_index.set_connector_active()
+        # renew the active signal and prime the connector active signal (renewed
+        # inside the connector) in one round trip
+        pipe = redis_connector_index.redis.pipeline(transaction=False)
+        redis_connector_index.set_active(pipe=pipe)
+        redis_connector_index.set_connector_active(pipe=pipe)
+        pipe.execute()
 
         while True:
-            sleep(5)
+            event = _wait_for_indexing_event(
+                pubsub, job.process.sentinel, _WATCHDOG_HEARTBEAT_INTERVAL
+            )
+            if event in (
+                RedisConnectorIndex.EVENT_GENERATOR_COMPLETE,
+                _PROCESS_EXITED,
+            ):
+                # the spawned task is exiting (or its sentinel fired slightly before
+                # it was reaped). wait for it here so the exit is handled on this
+                # pass rather than the next heartbeat
+                job.process.join(timeout=_WATCHDOG_HEARTBEAT_INTERVAL)
 
             now = time.monotonic()
 
-            # renew watchdog signal (this has a shorter timeout than set_active)
-            redis_connector_index.set_watchdog(True)
-
-            # renew active signal
-            redis_connector_index.set_active()
+            # renew the watchdog signal (this has a shorter timeout than the active
+            # signal) and the active signal, and read back the termination signal
+            # and connector activity ttl in the same round trip
+            heartbeat = redis_connector_index.watchdog_heartbeat(self.request.id)
 
             # if the job is done, clean up and break
             if job.done():
@@ -1227,7 +1416,7 @@ def connector_indexing_proxy_task(
                     last_memory_emit_time = current_time
 
             # if a termination signal is detected, break (exit point will clean up)
-            if self.request.id and redis_connector_index.terminating(self.request.id):
+            if heartbeat.terminating:
                 task_logger.warning(
                     log_builder.build("Indexing watchdog - termination signal detected")
                 )
@@ -1236,7 +1425,7 @@ def connector_indexing_proxy_task(
                 break
 
             # if activity timeout is detected, break (exit point will clean up)
-            ttl = redis_connector_index.connector_active_ttl()
+            ttl = heartbeat.connector_active_ttl
             if ttl < 0:
                 # verify expectations around ttl
                 last_observed = last_activity_ttl_observed - now
@@ -1268,35 +1457,9 @@ def connector_indexing_proxy_task(
                 last_activity_ttl_observed = now
                 last_activity_ttl = ttl
 
-            # if the spawned task is still running, restart the check once again
-            # if the index attempt is not in a finished status
-            try:
-                with get_session_with_current_tenant() as db_session:
-                    index_attempt = get_index_attempt(
-                        db_session=db_session, index_attempt_id=index_attempt_id
-                    )
-
-                    if not index_attempt:
-                        continue
-
-                    if not index_attempt.is_finished():
-                        continue
-
-            except Exception:
-                task_logger.exception(
-                    log_builder.build(
-                        "Indexing watchdog - transient exception looking up index attempt"
-                    )
-                )
-                continue
-
     except Exception as e:
         # Check for Broken pipe errors and retry if possible
-        error_message = str(e).lower()
-        if ("broken pipe" in error_message or 
-            "errno 32" in error_message or 
-            isinstance(e, BrokenPipeError)):
-            
+        if _is_broken_pipe(e):
             # Log the broken pipe error for debugging
             task_logger.warning(
                 log_builder.build(
@@ -1336,6 +1499,8 @@ def connector_indexing_proxy_task(
             result.exception_str = str(e)
         else:
             result.exception_str = traceback.format_exc()
+    finally:
+        pubsub.close()
 
     # handle exit and reporting
     elapsed = time.monotonic() - start
@@ -1359,11 +1524,10 @@ def connector_indexing_proxy_task(
                 )
             )
 
-        normalized_exception_str = "None"
-        if result.exception_str:
-            normalized_exception_str = result.exception_str.replace(
-                "\n", "\\n"
-            ).replace('"', '\\"')
+        # quote and escape the traceback onto a single line in one pass
+        normalized_exception_str = json.dumps(
+            result.exception_str or "None", ensure_ascii=False
+        )
 
         task_logger.warning(
             log_builder.build(
@@ -1371,7 +1535,7 @@ def connector_indexing_proxy_task(
                 source=result.connector_source,
                 status=result.status.value,
                 exit_code=str(result.exit_code),
-                exception=f'"{normalized_exception_str}"',
+                exception=normalized_exception_str,
                 elapsed=f"{elapsed:.2f}s",
             )
         )
@@ -1474,9 +1638,7 @@ def check_for_checkpoint_cleanup(self: Task, *, tenant_id: str) -> None:
         return None
     finally:
         if locked:
-            if lock.owned():
-                lock.release()
-            else:
+            if not release_lock_if_owned(lock):
                 task_logger.error(
                     "check_for_checkpoint_cleanup - Lock not owned on completion: "
                     f"tenant={tenant_id}"
@@ -10,7 +10,8 @@ import sys
 import traceback
 from collections.abc import Callable
 from dataclasses import dataclass
-from multiprocessing.context import SpawnProcess
+from multiprocessing import forkserver
+from multiprocessing.process import BaseProcess
 from typing import Any
 from typing import Literal
 from typing import Optional
@@ -107,12 +108,19 @@ def _run_in_process(
     _initializer(func, queue, args, kwargs)
 
 
+def start_forkserver(preload_modules: list[str]) -> None:
+    """Starts the forkserver with preload_modules already imported, so processes
+    submitted with start_method="forkserver" don't pay for those imports."""
+    mp.get_context("forkserver").set_forkserver_preload(preload_modules)
+    forkserver.ensure_running()
+
+
 @dataclass
 class SimpleJob:
     """Drop in replacement for `dask.distributed.Future`"""
 
     id: int
-    process: Optional["SpawnProcess"] = None
+    process: Optional["BaseProcess"] = None
     queue: Optional[mp.Queue] = None
     _exception: Optional[str] = None
 
@@ -162,8 +170,9 @@ class SimpleJob:
 class SimpleJobClient:
     """Drop in replacement for `dask.distributed.Client`"""
 
-    def __init__(self, n_workers: int = 1) -> None:
+    def __init__(self, n_workers: int = 1, start_method: str = "spawn") -> None:
         self.n_workers = n_workers
+        self.start_method = start_method
         self.job_id_counter = 0
         self.jobs: dict[int, SimpleJob] = {}
 
@@ -188,9 +197,9 @@ class SimpleJobClient:
         job_id = self.job_id_counter
         self.job_id_counter += 1
 
-        # this approach allows us to always "spawn" a new process regardless of
-        # get_start_method's current setting
-        ctx = mp.get_context("spawn")
+        # this approach allows us to always "spawn" (or use the forkserver) regardless
+        # of get_start_method's current setting. plain fork is never used.
+        ctx = mp.get_context(self.start_method)
         queue = ctx.Queue()
         process = ctx.Process(
             target=_run_in_process, args=(func, queue, args), daemon=True
@@ -336,6 +336,13 @@ try:
 except ValueError:
     CELERY_WORKER_INDEXING_CONCURRENCY = CELERY_WORKER_INDEXING_CONCURRENCY_DEFAULT
 
+# Indexing children are spawned by default, so each one starts a fresh interpreter
+# and re-imports the indexing code. When enabled, they are instead forked from a
+# forkserver that imports it once at worker startup.
+INDEXING_CHILD_USE_FORKSERVER = (
+    os.environ.get("INDEXING_CHILD_USE_FORKSERVER", "").lower() == "true"
+)
+
 
 CELERY_WORKER_KG_PROCESSING_CONCURRENCY = int(
     os.environ.get("CELERY_WORKER_KG_PROCESSING_CONCURRENCY") or 4
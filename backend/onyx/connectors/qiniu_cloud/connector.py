@@ -8,15 +8,22 @@
 - 增量和全量数据处理
 """
 
+import contextvars
 import os
+import tempfile
+import threading
 import time
 import uuid
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from io import BytesIO
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import IO, Any, Dict, Iterator, List, Optional, Set, Tuple
 
-from qiniu import Auth, put_file, put_data, BucketManager
+from qiniu import Auth, put_file, put_data, BucketManager, build_batch_delete
 import requests
+from requests.adapters import HTTPAdapter
+from sqlalchemy.orm import Session
+from urllib3.util import Retry
 
 from onyx.configs.app_configs import INDEX_BATCH_SIZE
 from onyx.configs.constants import DocumentSource, FileOrigin
@@ -41,6 +48,19 @@ from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
 
+# 同时下载和解析的对象数上限，16 个并发足以占满对象存储的带宽
+MAX_CONCURRENT_OBJECTS = 16
+
+# 下载时每次读取的块大小，以及下载缓冲保留在内存中的上限（超过后溢出到磁盘）
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+DOWNLOAD_SPOOL_MAX_SIZE = 8 << 20
+
+# 七牛云批量操作单次请求最多包含的操作数
+BATCH_OPERATION_LIMIT = 1000
+
+# 将对象键转换为文件 ID 时使用的字符替换表
+_OBJECT_KEY_TO_FILE_ID = str.maketrans({"/": "_"})
+
 
 class QiniuCloudConnector(LoadConnector, PollConnector):
     """
@@ -77,6 +97,9 @@ class QiniuCloudConnector(LoadConnector, PollConnector):
         self.bucket_domain = bucket_domain.rstrip("/")
         self.region = region
         self.prefix = prefix.rstrip("/") if prefix else ""
+        # 解析对象键时使用的前缀（带分隔符），避免每次调用重新拼接
+        self._prefix_slash = f"{self.prefix}/" if self.prefix else ""
+        self._prefix_slash_len = len(self._prefix_slash)
         self.folder_uuid = folder_uuid
         self.auto_create_folder = auto_create_folder
         self.folder_uuid_length = folder_uuid_length
@@ -95,6 +118,45 @@ class QiniuCloudConnector(LoadConnector, PollConnector):
         # 文件夹分隔符和占位文件名
         self.folder_separator = "/"
         self.placeholder_filename = ".folder_placeholder"
+        
+        # 扩展名是否受支持的缓存，避免对每个对象重复判断
+        self._accepted_ext_cache: Dict[str, bool] = {}
+        
+        # 完整遍历连接器范围时顺带记录的有序文件夹列表，None 表示尚未遍历或已失效
+        self._folder_cache: Optional[List[str]] = None
+        
+        # 下载复用的 HTTP 会话，首次下载时才创建，只做上传和列举的实例不会持有连接池
+        self._session: Optional[requests.Session] = None
+        self._session_lock = threading.Lock()
+    
+    def _get_http_session(self) -> requests.Session:
+        """获取下载使用的 HTTP 会话，连接池大小与并发数匹配以保持长连接"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    retry_strategy = Retry(
+                        total=3,
+                        backoff_factor=0.3,
+                        status_forcelist=[429, 500, 502, 503, 504],
+                    )
+                    adapter = HTTPAdapter(
+                        pool_connections=MAX_CONCURRENT_OBJECTS,
+                        pool_maxsize=2 * MAX_CONCURRENT_OBJECTS,
+                        max_retries=retry_strategy,
+                    )
+                    session = requests.Session()
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+        
+        return self._session
+    
+    def close(self) -> None:
+        """关闭下载使用的 HTTP 会话，之后的下载会重新创建会话"""
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
     
     def set_allow_images(self, allow_images: bool) -> None:
         """设置是否允许处理图像"""
@@ -167,80 +229,128 @@ class QiniuCloudConnector(LoadConnector, PollConnector):
     def parse_object_key(self, object_key: str) -> Tuple[str, str]:
         """解析对象键，提取文件夹前缀和文件名"""
         # 移除前缀
-        if self.prefix and object_key.startswith(f"{self.prefix}/"):
-            object_key = object_key[len(self.prefix) + 1:]
+        if self._prefix_slash and object_key.startswith(self._prefix_slash):
+            object_key = object_key[self._prefix_slash_len:]
         
         # 分离文件夹和文件名
-        parts = object_key.split("/")
-        if len(parts) < 2:
+        folder_prefix, sep, filename = object_key.partition("/")
+        if not sep:
             # 如果没有文件夹结构，使用根目录
             return "root", object_key
         
-        folder_prefix = parts[0]
-        filename = "/".join(parts[1:])
-        
         return folder_prefix, filename
     
-    def discover_existing_folders(self) -> Set[str]:
+    def _is_accepted_file(self, object_key: str) -> bool:
+        """检查对象的扩展名是否受支持，结果按扩展名缓存"""
+        file_ext = get_file_ext(object_key)
+        accepted = self._accepted_ext_cache.get(file_ext)
+        if accepted is None:
+            accepted = is_accepted_file_ext(file_ext, OnyxExtensionType.All)
+            self._accepted_ext_cache[file_ext] = accepted
+        return accepted
+    
+    def _iter_all_objects(self, prefix: str, limit: int = 1000) -> Iterator[Dict[str, Any]]:
         """
-        发现七牛云OSS中已有的文件夹前缀
+        分页遍历指定前缀下的所有对象
         
-        Returns:
-            已有文件夹前缀的集合
+        遍历覆盖整个连接器范围并完整结束时，顺带记录文件夹列表，
+        后续 discover_existing_folders 和 list_folders 直接复用，无需再次遍历存储桶
+        
+        七牛云按对象键的字典序返回对象，同一文件夹下的对象是连续的，
+        因此只需与上一个文件夹比较即可去重，得到的列表按对象键的顺序排列
+        
+        Args:
+            prefix: 对象键前缀
+            limit: 每页对象数
+            
+        Yields:
+            七牛云返回的对象信息
         """
-        folders = set()
+        base_prefix = self._prefix_slash
+        collect_folders = prefix in (self.prefix, base_prefix)
+        folders: List[str] = []
+        last_folder: Optional[str] = None
         
+        # 处理当前页的同时预取下一页，隐藏列举请求的往返延迟
+        list_executor = ThreadPoolExecutor(max_workers=1)
         try:
-            # 构建基础前缀
-            base_prefix = self.prefix + "/" if self.prefix else ""
+            ret, eof, info = self.bucket_manager.list(
+                self.bucket_name,
+                prefix=prefix,
+                limit=limit
+            )
             
-            # 列出对象
-            marker = None
             while True:
-                ret, eof, info = self.bucket_manager.list(
-                    self.bucket_name,
-                    prefix=base_prefix,
-                    marker=marker,
-                    limit=1000
-                )
-                
                 if ret is None:
-                    logger.warning(f"Failed to list objects: {info}")
-                    break
+                    logger.error(f"Failed to list objects with prefix '{prefix}': {info}")
+                    return
+                
+                next_page: Optional[Future] = None
+                if not eof:
+                    next_page = list_executor.submit(
+                        self.bucket_manager.list,
+                        self.bucket_name,
+                        prefix=prefix,
+                        marker=ret.get("marker"),
+                        limit=limit
+                    )
                 
                 for item in ret.get("items", []):
-                    object_key = item.get("key", "")
-                    if object_key:
-                        # 解析对象键，提取文件夹前缀
-                        try:
+                    if collect_folders:
+                        object_key = item.get("key", "")
+                        if object_key.startswith(base_prefix):
                             folder_prefix, _ = self.parse_object_key(object_key)
-                            if folder_prefix and folder_prefix != "root":
-                                folders.add(folder_prefix)
-                        except Exception as e:
-                            logger.debug(f"Failed to parse object key {object_key}: {e}")
-                            continue
+                            if folder_prefix != last_folder and folder_prefix and folder_prefix != "root":
+                                folders.append(folder_prefix)
+                                last_folder = folder_prefix
+                    
+                    yield item
                 
-                if eof:
+                if next_page is None:
                     break
-                marker = ret.get("marker")
-            
-            logger.info(f"Discovered {len(folders)} existing folders: {sorted(folders)}")
-            return folders
+                ret, eof, info = next_page.result()
+        finally:
+            list_executor.shutdown(wait=False, cancel_futures=True)
+        
+        if collect_folders:
+            self._folder_cache = folders
+    
+    def _get_folders(self) -> List[str]:
+        """获取有序的文件夹列表，缓存失效时重新遍历存储桶"""
+        if self._folder_cache is None:
+            for _ in self._iter_all_objects(self._prefix_slash):
+                pass
+        
+        return list(self._folder_cache or ())
+    
+    def discover_existing_folders(self) -> Set[str]:
+        """
+        发现七牛云OSS中已有的文件夹前缀
+        
+        Returns:
+            已有文件夹前缀的集合
+        """
+        try:
+            folders = self._get_folders()
+            logger.info(f"Discovered {len(folders)} existing folders: {folders}")
+            return set(folders)
             
         except Exception as e:
             logger.error(f"Error discovering existing folders: {e}")
             return set()
     
-    @handle_qiniu_exception
-    def _download_object(self, object_key: str) -> bytes:
+    def _download_object(self, object_key: str, sink: IO[bytes]) -> int:
         """
         下载七牛云对象
         
+        以流式方式将对象内容写入 sink，避免在内存中缓存整个响应
+        
         Args:
             object_key: 对象键
+            sink: 可写的二进制文件对象
             
         Returns:
-            对象内容字节
+            写入的字节数
         """
         self._ensure_initialized()
         
@@ -252,16 +362,18 @@ class QiniuCloudConnector(LoadConnector, PollConnector):
         # 如果是私有空间，需要生成签名URL
         private_url = self.auth.private_download_url(download_url, expires=3600)
         
-        # 使用 requests session 确保连接正确关闭，避免资源泄漏
-        with requests.Session() as session:
-            response = session.get(private_url, timeout=30)
+        # 复用连接器的 HTTP 会话，避免每个对象重新建立 TCP/TLS 连接
+        content_size = 0
+        with self._get_http_session().get(private_url, timeout=30, stream=True) as response:
             response.raise_for_status()
             
-            content = response.content
-            content_size = len(content)
-            logger.info(f"Downloaded {object_key}: {content_size} bytes")
-            
-            return content
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                sink.write(chunk)
+                content_size += len(chunk)
+        
+        logger.info(f"Downloaded {object_key}: {content_size} bytes")
+        
+        return content_size
     
     @handle_qiniu_exception
     def _get_object_metadata(self, object_key: str) -> Dict[str, Any]:
@@ -289,6 +401,36 @@ class QiniuCloudConnector(LoadConnector, PollConnector):
             "metadata": ret
         }
     
+    def _delete_many(self, object_keys: List[str]) -> bool:
+        """
+        批量删除对象，每个请求最多包含 BATCH_OPERATION_LIMIT 个操作
+        
+        Args:
+            object_keys: 对象键列表
+            
+        Returns:
+            是否全部删除成功（对象不存在视为成功）
+        """
+        self._ensure_initialized()
+        
+        success = True
+        
+        for i in range(0, len(object_keys), BATCH_OPERATION_LIMIT):
+            keys = object_keys[i:i + BATCH_OPERATION_LIMIT]
+            ret, info = self.bucket_manager.batch(build_batch_delete(self.bucket_name, keys))
+            
+            if ret is None:
+                logger.error(f"Failed to batch delete objects: {info}")
+                return False
+            
+            # 612 表示对象不存在
+            for key, result in zip(keys, ret):
+                if result.get("code") not in (200, 612):
+                    logger.error(f"Failed to delete object {key}: {result}")
+                    success = False
+        
+        return success
+    
     def _get_qiniu_link(self, object_key: str) -> str:
         """
         生成七牛云对象链接
@@ -323,7 +465,7 @@ class QiniuCloudConnector(LoadConnector, PollConnector):
             图像节
         """
         # 生成唯一的文件 ID
-        file_id = f"QINIU_{self.bucket_name}_{object_key.replace('/', '_')}"
+        file_id = f"QINIU_{self.bucket_name}_{object_key.translate(_OBJECT_KEY_TO_FILE_ID)}"
         
         # 存储图像并创建节
         section, _ = store_image_and_create_section(
@@ -337,19 +479,36 @@ class QiniuCloudConnector(LoadConnector, PollConnector):
         
         return section
     
+    @contextmanager
+    def _db_session_scope(self, db_session: Optional[Session] = None) -> Iterator[Session]:
+        """
+        获取用于存储图像的数据库会话
+        
+        SQLAlchemy 会话不是线程安全的，未传入会话时在当前线程中创建独立的会话，
+        并且只在需要写数据库时持有连接
+        """
+        if db_session is not None:
+            yield db_session
+            return
+        
+        with get_session_with_current_tenant() as session:
+            yield session
+    
     def _process_qiniu_object(
         self, 
         object_key: str, 
         last_modified: datetime,
-        db_session
+        db_session: Optional[Session] = None
     ) -> Document | None:
         """
         处理七牛云对象并转换为 Document
         
+        下载和文本提取不占用数据库连接，只有存储图像时才需要数据库会话
+        
         Args:
             object_key: 对象键
             last_modified: 最后修改时间
-            db_session: 数据库会话
+            db_session: 数据库会话，为 None 时在存储图像时临时获取
             
         Returns:
             Document 对象或 None
@@ -364,42 +523,46 @@ class QiniuCloudConnector(LoadConnector, PollConnector):
             
             # 检查文件扩展名
             file_ext = get_file_ext(filename)
-            if not is_accepted_file_ext(file_ext, OnyxExtensionType.All):
+            if not self._is_accepted_file(filename):
                 logger.debug(f"Skipping unsupported file: {filename}")
                 return None
             
-            # 下载对象内容
-            object_content = self._download_object(object_key)
-            
-            # 生成链接
-            link = self._get_qiniu_link(object_key)
-            
-            # 生成文档 ID
-            doc_id = f"QINIU_CLOUD:{self.bucket_name}:{object_key}"
+            # 图像处理关闭时无需下载图像文件
+            is_image = file_ext in LoadConnector.IMAGE_EXTENSIONS
+            if is_image and not self._allow_images:
+                logger.debug(f"Skipping image file: {object_key} (image processing disabled)")
+                return None
             
-            # 处理图像文件
-            if file_ext in LoadConnector.IMAGE_EXTENSIONS:
-                if not self._allow_images:
-                    logger.debug(f"Skipping image file: {object_key} (image processing disabled)")
-                    return None
+            # 下载对象内容，小文件保留在内存中，大文件溢出到磁盘
+            with tempfile.SpooledTemporaryFile(max_size=DOWNLOAD_SPOOL_MAX_SIZE) as sink:
+                self._download_object(object_key, sink)
+                sink.seek(0)
                 
-                image_section = self._create_image_section(
-                    object_content, object_key, filename, link, db_session
-                )
+                # 生成链接
+                link = self._get_qiniu_link(object_key)
                 
-                return Document(
-                    id=doc_id,
-                    sections=[image_section],
-                    source=DocumentSource.QINIU_CLOUD,
-                    semantic_identifier=filename,
-                    doc_updated_at=last_modified,
-                    metadata={"folder_prefix": folder_uuid}
-                )
-            
-            # 处理文档文件
-            try:
+                # 生成文档 ID
+                doc_id = f"QINIU_CLOUD:{self.bucket_name}:{object_key}"
+                
+                # 处理图像文件
+                if is_image:
+                    with self._db_session_scope(db_session) as image_db_session:
+                        image_section = self._create_image_section(
+                            sink.read(), object_key, filename, link, image_db_session
+                        )
+                    
+                    return Document(
+                        id=doc_id,
+                        sections=[image_section],
+                        source=DocumentSource.QINIU_CLOUD,
+                        semantic_identifier=filename,
+                        doc_updated_at=last_modified,
+                        metadata={"folder_prefix": folder_uuid}
+                    )
+                
+                # 处理文档文件
                 extraction_result = extract_text_and_images(
-                    BytesIO(object_content), 
+                    sink, 
                     file_name=filename
                 )
                 
@@ -429,31 +592,33 @@ class QiniuCloudConnector(LoadConnector, PollConnector):
                 sections: List[TextSection | ImageSection] = []
                 
                 # 添加文本节
-                if extraction_result.text_content.strip():
-                    sections.append(
-                        TextSection(
-                            link=source_link,
-                            text=extraction_result.text_content.strip()
-                        )
-                    )
+                text = extraction_result.text_content.strip()
+                if text:
+                    sections.append(TextSection(link=source_link, text=text))
                 
-                # 添加嵌入图像节
-                for idx, (img_data, img_name) in enumerate(
-                    extraction_result.embedded_images, start=1
-                ):
-                    try:
-                        image_section = self._create_image_section(
-                            img_data, f"{object_key}_image_{idx}", 
-                            f"{filename} - image {idx}", source_link, db_session
-                        )
-                        sections.append(image_section)
-                    except Exception as e:
-                        logger.warning(f"Failed to process embedded image {idx} in {filename}: {e}")
+                # 添加嵌入图像节，仅在有图像需要存储时才获取数据库会话
+                if extraction_result.embedded_images:
+                    with self._db_session_scope(db_session) as image_db_session:
+                        for idx, (img_data, img_name) in enumerate(
+                            extraction_result.embedded_images, start=1
+                        ):
+                            try:
+                                image_section = self._create_image_section(
+                                    img_data, f"{object_key}_image_{idx}", 
+                                    f"{filename} - image {idx}", source_link, image_db_session
+                                )
+                                sections.append(image_section)
+                            except Exception as e:
+                                logger.warning(f"Failed to process embedded image {idx} in {filename}: {e}")
+                
+                # 没有任何内容时使用空文本节
+                if not sections:
+                    sections.append(TextSection(link=source_link, text=""))
                 
                 # 创建文档
                 return Document(
                     id=doc_id,
-                    sections=sections if sections else [TextSection(link=source_link, text="")],
+                    sections=sections,
                     source=DocumentSource.QINIU_CLOUD,
                     semantic_identifier=file_display_name,
                     doc_updated_at=time_updated,
@@ -462,10 +627,6 @@ class QiniuCloudConnector(LoadConnector, PollConnector):
                     secondary_owners=secondary_owners
                 )
                 
-            except Exception as e:
-                logger.error(f"Failed to process document {object_key}: {e}")
-                return None
-                
         except Exception as e:
             logger.error(f"Failed to process Qiniu object {object_key}: {e}")
             return None
@@ -478,6 +639,9 @@ class QiniuCloudConnector(LoadConnector, PollConnector):
         """
         生成七牛云对象文档
         
+        列举在当前线程中进行，对象的下载和解析分发到线程池并发执行，
+        同时在途的任务数不超过 MAX_CONCURRENT_OBJECTS
+        
         Args:
             start_time: 开始时间
             end_time: 结束时间
@@ -494,71 +658,91 @@ class QiniuCloudConnector(LoadConnector, PollConnector):
         
         logger.info(f"Starting Qiniu objects processing with prefix: {self.prefix}")
         
+        # 七牛云 putTime 的单位为 100 纳秒
+        start_put_time = int(start_time.timestamp() * 10000000)
+        end_put_time = int(end_time.timestamp() * 10000000)
+        
+        in_flight: Dict[Future, str] = {}
+        
+        def _drain(return_when: str) -> List[Document]:
+            """等待在途任务完成，返回成功生成的文档"""
+            nonlocal successful_documents
+            documents: List[Document] = []
+            done, _ = wait(in_flight, return_when=return_when)
+            for future in done:
+                object_key = in_flight.pop(future)
+                document = future.result()
+                if document:
+                    documents.append(document)
+                    successful_documents += 1
+                    logger.info(f"Successfully processed: {object_key} -> Document ID: {document.id}")
+                else:
+                    logger.warning(f"Failed to create document for: {object_key}")
+            return documents
+        
+        executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_OBJECTS)
         try:
-            # 使用分页获取对象列表
-            marker = None
-            
-            with get_session_with_current_tenant() as db_session:
-                while True:
-                    ret, eof, info = self.bucket_manager.list(
-                        self.bucket_name,
-                        prefix=self.prefix,
-                        marker=marker,
-                        limit=1000
-                    )
-                    
-                    if ret is None:
-                        logger.error(f"Failed to list objects: {info}")
-                        break
-                    
-                    for item in ret.get("items", []):
-                        object_key = item["key"]
-                        total_objects += 1
-                        
-                        # 跳过目录
-                        if object_key.endswith("/"):
-                            continue
-                        
-                        # 检查时间范围
-                        put_time = item.get("putTime", 0)
-                        last_modified = datetime.fromtimestamp(put_time / 10000000, tz=timezone.utc)
-                        
-                        if not (start_time <= last_modified <= end_time):
-                            continue
-                        
-                        processed_objects += 1
-                        logger.info(f"Processing file: {object_key}")
-                        
-                        # 处理对象
-                        document = self._process_qiniu_object(
-                            object_key, last_modified, db_session
-                        )
-                        
-                        if document:
-                            batch.append(document)
-                            successful_documents += 1
-                            logger.info(f"Successfully processed: {object_key} -> Document ID: {document.id}")
-                            
-                            # 达到批次大小时生成批次
-                            if len(batch) >= self.batch_size:
-                                yield batch
-                                batch = []
-                        else:
-                            logger.warning(f"Failed to create document for: {object_key}")
+            # 分页遍历对象列表
+            for item in self._iter_all_objects(self.prefix):
+                object_key = item["key"]
+                total_objects += 1
+                
+                # 跳过目录、占位文件和不支持的文件，避免为其创建任务
+                if object_key.endswith("/") or object_key.endswith(self.placeholder_filename):
+                    continue
+                
+                if not self._is_accepted_file(object_key):
+                    logger.debug(f"Skipping unsupported file: {object_key}")
+                    continue
+                
+                # 检查时间范围，直接比较整数 putTime，只为通过过滤的对象创建 datetime
+                put_time = item.get("putTime", 0)
+                if not (start_put_time <= put_time <= end_put_time):
+                    continue
+                
+                last_modified = datetime.fromtimestamp(put_time / 10000000, tz=timezone.utc)
+                
+                # 在途任务已满时，等待至少一个任务完成
+                if len(in_flight) >= MAX_CONCURRENT_OBJECTS:
+                    batch.extend(_drain(FIRST_COMPLETED))
                     
-                    if eof:
-                        break
-                    marker = ret.get("marker")
+                    # 达到批次大小时生成批次，多出的文档留到下一批次
+                    if len(batch) >= self.batch_size:
+                        yield batch[:self.batch_size]
+                        batch = batch[self.batch_size:]
                 
-                # 生成最后一个批次
-                if batch:
-                    yield batch
+                processed_objects += 1
+                logger.info(f"Processing file: {object_key}")
                 
-                logger.info(f"Qiniu processing complete - Total: {total_objects}, Processed: {processed_objects}, Success: {successful_documents}")
+                # 复制当前上下文，使工作线程获得当前的租户 ID
+                current_context = contextvars.copy_context()
+                future = executor.submit(
+                    current_context.run,
+                    self._process_qiniu_object,
+                    object_key,
+                    last_modified,
+                )
+                in_flight[future] = object_key
+            
+            # 等待剩余任务完成
+            if in_flight:
+                batch.extend(_drain(ALL_COMPLETED))
+            
+            # 生成剩余的批次
+            while batch:
+                yield batch[:self.batch_size]
+                batch = batch[self.batch_size:]
+            
+            logger.info(f"Qiniu processing complete - Total: {total_objects}, Processed: {processed_objects}, Success: {successful_documents}")
                     
         except Exception as e:
             logger.error(f"Error yielding Qiniu objects: {e}")
             raise
+        finally:
+            # 生成器提前关闭时取消尚未开始的任务
+            executor.shutdown(wait=True, cancel_futures=True)
+            # 同步结束后释放下载连接
+            self.close()
     
     def load_from_state(self) -> GenerateDocumentsOutput:
         """
@@ -607,22 +791,17 @@ class QiniuCloudConnector(LoadConnector, PollConnector):
         if not self.bucket_domain:
             raise ConnectorValidationError("存储桶域名不能为空")
         
-        try:
-            # 测试列举对象权限
-            ret, eof, info = self.bucket_manager.list(
-                self.bucket_name,
-                prefix=self.prefix,
-                limit=1
-            )
-            
-            if ret is None:
-                raise ConnectorValidationError(f"无法访问存储桶: {info}")
-            
-            logger.info(f"Qiniu connector validation successful for bucket: {self.bucket_name}")
-            
-        except Exception as e:
-            logger.error(f"Qiniu connector validation failed: {e}")
-            raise
+        # 测试列举对象权限
+        ret, eof, info = self.bucket_manager.list(
+            self.bucket_name,
+            prefix=self.prefix,
+            limit=1
+        )
+        
+        if ret is None:
+            raise ConnectorValidationError(f"无法访问存储桶: {info}")
+        
+        logger.info(f"Qiniu connector validation successful for bucket: {self.bucket_name}")
     
     # 扩展功能：文件上传和下载
     
@@ -648,10 +827,11 @@ class QiniuCloudConnector(LoadConnector, PollConnector):
             logger.error(f"Failed to create folder placeholder: {info}")
             raise QiniuConnectorError(f"创建文件夹占位文件失败: {info}")
         
+        self._folder_cache = None
+        
         logger.info(f"Created folder: {folder_uuid}")
         return folder_uuid
     
-    @handle_qiniu_exception
     def folder_exists(self, folder_uuid: str) -> bool:
         """检查文件夹是否存在"""
         try:
@@ -700,6 +880,26 @@ class QiniuCloudConnector(LoadConnector, PollConnector):
             else:
                 raise QiniuUploadError(filename, f"文件夹 {folder_uuid} 不存在")
         
+        object_key = self._put_file_to_folder(local_file_path, filename, folder_uuid)
+        return folder_uuid, object_key
+    
+    def _put_file_to_folder(
+        self,
+        local_file_path: str,
+        filename: str,
+        folder_uuid: str
+    ) -> str:
+        """
+        上传文件到已存在的文件夹
+        
+        Args:
+            local_file_path: 本地文件路径
+            filename: 目标文件名
+            folder_uuid: 文件夹 UUID
+            
+        Returns:
+            对象键
+        """
         # 创建对象键
         object_key = self.create_object_key(folder_uuid, filename)
         
@@ -713,9 +913,8 @@ class QiniuCloudConnector(LoadConnector, PollConnector):
             raise QiniuUploadError(filename, f"上传失败: {info}")
         
         logger.info(f"Uploaded file {filename} to folder {folder_uuid}")
-        return folder_uuid, object_key
+        return object_key
     
-    @handle_qiniu_exception
     def download_file_from_folder(
         self, 
         folder_uuid: str, 
@@ -739,12 +938,9 @@ class QiniuCloudConnector(LoadConnector, PollConnector):
             # 创建对象键
             object_key = self.create_object_key(folder_uuid, filename)
             
-            # 下载文件
-            object_content = self._download_object(object_key)
-            
-            # 保存到本地
+            # 下载文件并直接写入本地
             with open(local_path, 'wb') as f:
-                f.write(object_content)
+                self._download_object(object_key, f)
             
             logger.info(f"Downloaded file {filename} from folder {folder_uuid}")
             return True
@@ -770,18 +966,26 @@ class QiniuCloudConnector(LoadConnector, PollConnector):
         """
         self._ensure_initialized()
         
-        # 确定文件夹
+        # 确定文件夹，只检查一次而不是每个文件都查询
         if folder_uuid is None and self.auto_create_folder:
             folder_uuid = self.create_folder()
         elif folder_uuid is None:
             raise QiniuUploadError("multiple files", "未指定文件夹且禁用自动创建")
+        elif not self.folder_exists(folder_uuid):
+            if self.auto_create_folder:
+                self.create_folder(folder_uuid)
+            else:
+                raise QiniuUploadError("multiple files", f"文件夹 {folder_uuid} 不存在")
         
         object_keys = []
         
         for file_path in file_paths:
             try:
-                _, object_key = self.upload_file_to_folder(
-                    file_path, folder_uuid=folder_uuid
+                if not os.path.exists(file_path):
+                    raise QiniuUploadError(file_path, "本地文件不存在")
+                
+                object_key = self._put_file_to_folder(
+                    file_path, os.path.basename(file_path), folder_uuid
                 )
                 object_keys.append(object_key)
             except Exception as e:
@@ -794,42 +998,13 @@ class QiniuCloudConnector(LoadConnector, PollConnector):
         """列出所有文件夹"""
         self._ensure_initialized()
         
-        folders = set()
-        
         try:
-            # 列举所有对象
-            marker = None
-            while True:
-                ret, eof, info = self.bucket_manager.list(
-                    self.bucket_name, 
-                    prefix=self.prefix,
-                    marker=marker,
-                    limit=1000
-                )
-                
-                if ret is None:
-                    logger.error(f"Failed to list objects: {info}")
-                    break
-                
-                # 提取文件夹前缀
-                for item in ret.get("items", []):
-                    key = item["key"]
-                    try:
-                        folder_prefix, _ = self.parse_object_key(key)
-                        if folder_prefix and folder_prefix != "root":
-                            folders.add(folder_prefix)
-                    except Exception:
-                        continue
-                
-                if eof:
-                    break
-                marker = ret.get("marker")
-        
+            folders = self._get_folders()
         except Exception as e:
             logger.error(f"Failed to list folders: {e}")
             return []
         
-        return sorted(list(folders))
+        return folders
     
     def list_files_in_folder(self, folder_uuid: str) -> List[Dict[str, Any]]:
         """列出指定文件夹中的文件"""
@@ -839,43 +1014,26 @@ class QiniuCloudConnector(LoadConnector, PollConnector):
         folder_prefix = self._get_folder_prefix(folder_uuid)
         
         try:
-            marker = None
-            while True:
-                ret, eof, info = self.bucket_manager.list(
-                    self.bucket_name,
-                    prefix=f"{folder_prefix}/",
-                    marker=marker,
-                    limit=1000
-                )
+            for item in self._iter_all_objects(f"{folder_prefix}/"):
+                key = item["key"]
                 
-                if ret is None:
-                    logger.error(f"Failed to list files in folder {folder_uuid}: {info}")
-                    break
-                
-                for item in ret.get("items", []):
-                    key = item["key"]
-                    
-                    # 跳过占位文件
-                    if key.endswith(self.placeholder_filename):
-                        continue
-                    
-                    try:
-                        _, filename = self.parse_object_key(key)
-                        files.append({
-                            "filename": filename,
-                            "key": key,
-                            "size": item.get("fsize", 0),
-                            "last_modified": item.get("putTime", 0) / 10000000,  # 七牛云时间戳转换
-                            "etag": item.get("hash", ""),
-                            "mime_type": item.get("mimeType", "application/octet-stream")
-                        })
-                    except Exception as e:
-                        logger.warning(f"Failed to parse object key {key}: {e}")
-                        continue
+                # 跳过占位文件
+                if key.endswith(self.placeholder_filename):
+                    continue
                 
-                if eof:
-                    break
-                marker = ret.get("marker")
+                try:
+                    _, filename = self.parse_object_key(key)
+                    files.append({
+                        "filename": filename,
+                        "key": key,
+                        "size": item.get("fsize", 0),
+                        "last_modified": item.get("putTime", 0) / 10000000,  # 七牛云时间戳转换
+                        "etag": item.get("hash", ""),
+                        "mime_type": item.get("mimeType", "application/octet-stream")
+                    })
+                except Exception as e:
+                    logger.warning(f"Failed to parse object key {key}: {e}")
+                    continue
         
         except Exception as e:
             logger.error(f"Failed to list files in folder {folder_uuid}: {e}")
@@ -910,14 +1068,11 @@ class QiniuCloudConnector(LoadConnector, PollConnector):
             keys_to_delete.append(placeholder_key)
             
             # 批量删除
-            if keys_to_delete:
-                from qiniu import BucketManager
-                ops = [BucketManager.delete_op(self.bucket_name, key) for key in keys_to_delete]
-                ret, info = self.bucket_manager.batch(ops)
-                
-                if ret is None:
-                    logger.error(f"Failed to delete folder {folder_uuid}: {info}")
-                    return False
+            if not self._delete_many(keys_to_delete):
+                logger.error(f"Failed to delete folder {folder_uuid}")
+                return False
+            
+            self._folder_cache = None
             
             logger.info(f"Deleted folder: {folder_uuid}")
             return True
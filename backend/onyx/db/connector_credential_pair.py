@@ -398,14 +398,18 @@ def update_connector_credential_pair(
     )
 
 
-def set_cc_pair_repeated_error_state(
+def set_cc_pairs_repeated_error_state(
     db_session: Session,
-    cc_pair_id: int,
+    cc_pair_ids: list[int],
     in_repeated_error_state: bool,
 ) -> None:
+    """Sets in_repeated_error_state for all given cc pairs in a single UPDATE."""
+    if not cc_pair_ids:
+        return
+
     stmt = (
         update(ConnectorCredentialPair)
-        .where(ConnectorCredentialPair.id == cc_pair_id)
+        .where(ConnectorCredentialPair.id.in_(cc_pair_ids))
         .values(in_repeated_error_state=in_repeated_error_state)
     )
     db_session.execute(stmt)
@@ -326,7 +326,8 @@ class DocumentSet__ConnectorCredentialPair(Base):
         ForeignKey("document_set.id"), primary_key=True
     )
     connector_credential_pair_id: Mapped[int] = mapped_column(
-        ForeignKey("connector_credential_pair.id"), primary_key=True
+        ForeignKey("connector_credential_pair.id", ondelete="CASCADE"),
+        primary_key=True,
     )
     # if `True`, then is part of the current state of the document set
     # if `False`, then is a part of the prior state of the document set
@@ -527,6 +528,20 @@ class ConnectorCredentialPair(Base):
     )
 
 
+class CCPairPendingCleanup(Base):
+    """Staging table for bulk cc pair cleanup. Rows are claimed by a cleanup
+    instance via `marked_by` and removed once the cc pair has been deleted, so
+    leftover rows after a crash are resumed by the next run of that instance."""
+
+    __tablename__ = "cc_pairs_pending_cleanup"
+
+    cc_pair_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    marked_by: Mapped[str] = mapped_column(String, nullable=False, index=True)
+    marked_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
 class Document(Base):
     __tablename__ = "document"
     # NOTE: if more sensitive data is added here for display, make sure to add user/group permission
@@ -1567,7 +1582,7 @@ class IndexAttempt(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
 
     connector_credential_pair_id: Mapped[int] = mapped_column(
-        ForeignKey("connector_credential_pair.id"),
+        ForeignKey("connector_credential_pair.id", ondelete="CASCADE"),
         nullable=False,
     )
 
@@ -1680,7 +1695,7 @@ class IndexAttemptError(Base):
         nullable=False,
     )
     connector_credential_pair_id: Mapped[int] = mapped_column(
-        ForeignKey("connector_credential_pair.id"),
+        ForeignKey("connector_credential_pair.id", ondelete="CASCADE"),
         nullable=False,
     )
 
@@ -2531,7 +2546,7 @@ class Persona__UserFile(Base):
 
     persona_id: Mapped[int] = mapped_column(ForeignKey("persona.id"), primary_key=True)
     user_file_id: Mapped[int] = mapped_column(
-        ForeignKey("user_file.id"), primary_key=True
+        ForeignKey("user_file.id", ondelete="CASCADE"), primary_key=True
     )
 
 
@@ -2781,7 +2796,8 @@ class UserGroup__ConnectorCredentialPair(Base):
         ForeignKey("user_group.id"), primary_key=True
     )
     cc_pair_id: Mapped[int] = mapped_column(
-        ForeignKey("connector_credential_pair.id"), primary_key=True
+        ForeignKey("connector_credential_pair.id", ondelete="CASCADE"),
+        primary_key=True,
     )
     # if `True`, then is part of the current state of the UserGroup
     # if `False`, then is a part of the prior state of the UserGroup
@@ -3167,7 +3183,9 @@ class UserFile(Base):
     token_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
     cc_pair_id: Mapped[int | None] = mapped_column(
-        ForeignKey("connector_credential_pair.id"), nullable=True, unique=True
+        ForeignKey("connector_credential_pair.id", ondelete="CASCADE"),
+        nullable=True,
+        unique=True,
     )
     cc_pair: Mapped["ConnectorCredentialPair"] = relationship(
         "ConnectorCredentialPair", back_populates="user_file"
@@ -51,6 +51,15 @@ class HttpxPool:
     @classmethod
     def get(cls, name: str) -> httpx.Client:
         """Gets the httpx.Client. Will init to default settings if not init'd."""
+        # the common case of an already initialized client skips the lock. a dict
+        # lookup is atomic, so the only race is with close_client/close_all, and that
+        # one exists with the lock too: it only covers the lookup, so a caller can
+        # always end up holding a client that gets closed afterwards. closing is
+        # only done on shutdown, where that is acceptable.
+        client = cls._clients.get(name)
+        if client is not None:
+            return client
+
         with cls._lock:
             if name not in cls._clients:
                 cls._clients[name] = cls._init_client()
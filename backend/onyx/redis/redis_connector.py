@@ -1,17 +1,30 @@
 import time
+from typing import cast
 
 import redis
+from pydantic import BaseModel
 
 from onyx.db.models import SearchSettings
 from onyx.redis.redis_connector_delete import RedisConnectorDelete
 from onyx.redis.redis_connector_doc_perm_sync import RedisConnectorPermissionSync
 from onyx.redis.redis_connector_ext_group_sync import RedisConnectorExternalGroupSync
 from onyx.redis.redis_connector_index import RedisConnectorIndex
+from onyx.redis.redis_connector_index import RedisConnectorIndexPayload
 from onyx.redis.redis_connector_prune import RedisConnectorPrune
 from onyx.redis.redis_connector_stop import RedisConnectorStop
 from onyx.redis.redis_pool import get_redis_client
 
 
+class RedisConnectorFences(BaseModel):
+    """The fences an indexing attempt checks before starting, read in a single
+    round trip."""
+
+    delete_fenced: bool
+    stop_fenced: bool
+    # None if the index fence doesn't exist
+    index_payload: RedisConnectorIndexPayload | None
+
+
 class RedisConnector:
     """Composes several classes to simplify interacting with a connector and its
     associated background tasks / associated redis interactions."""
@@ -36,6 +49,27 @@ class RedisConnector:
             self.tenant_id, self.id, search_settings_id, self.redis
         )
 
+    def snapshot_fences(self, search_settings_id: int) -> RedisConnectorFences:
+        """Checks the deletion and stop fences and reads the index fence payload for
+        search_settings_id in one pipelined round trip."""
+        redis_connector_index = self.new_index(search_settings_id)
+
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.exists(self.delete.fence_key)
+        pipe.exists(self.stop.fence_key)
+        pipe.get(redis_connector_index.fence_key)
+        delete_exists, stop_exists, index_fence_bytes = cast(list, pipe.execute())
+
+        return RedisConnectorFences(
+            delete_fenced=bool(delete_exists),
+            stop_fenced=bool(stop_exists),
+            index_payload=(
+                RedisConnectorIndexPayload.model_validate_json(index_fence_bytes)
+                if index_fence_bytes is not None
+                else None
+            ),
+        )
+
     def wait_for_indexing_termination(
         self,
         search_settings_list: list[SearchSettings],
@@ -1,10 +1,10 @@
 from datetime import datetime
-from typing import Any
 from typing import cast
 from uuid import uuid4
 
 import redis
 from pydantic import BaseModel
+from redis.client import Pipeline
 
 from onyx.configs.constants import CELERY_INDEXING_WATCHDOG_CONNECTOR_TIMEOUT
 from onyx.configs.constants import OnyxRedisConstants
@@ -17,6 +17,22 @@ class RedisConnectorIndexPayload(BaseModel):
     celery_task_id: str | None
 
 
+class RedisConnectorIndexSnapshot(BaseModel):
+    """The redis state of an indexing attempt, read in a single round trip."""
+
+    payload: RedisConnectorIndexPayload | None
+    progress: int | None
+    completion: int | None
+    watchdog_signaled: bool
+
+
+class RedisConnectorIndexHeartbeat(BaseModel):
+    """What the watchdog reads back while renewing its signals."""
+
+    connector_active_ttl: int
+    terminating: bool
+
+
 class RedisConnectorIndex:
     """Manages interactions with redis for indexing tasks. Should only be accessed
     through RedisConnector."""
@@ -50,6 +66,11 @@ class RedisConnectorIndex:
     CONNECTOR_ACTIVE_PREFIX = PREFIX + "_connector_active"
     CONNECTOR_ACTIVE_TTL = CELERY_INDEXING_WATCHDOG_CONNECTOR_TIMEOUT
 
+    # pub/sub channel used to wake the watchdog when the state of the attempt changes
+    EVENTS_PREFIX = PREFIX + "_events"
+    EVENT_GENERATOR_COMPLETE = "generator_complete"
+    EVENT_TERMINATE = "terminate"
+
     def __init__(
         self,
         tenant_id: str,
@@ -80,6 +101,11 @@ class RedisConnectorIndex:
             f"{self.CONNECTOR_ACTIVE_PREFIX}_{id}/{search_settings_id}"
         )
 
+        # channels aren't keys, so TenantRedis won't prefix them for us
+        self.events_channel = (
+            f"{tenant_id}:{self.EVENTS_PREFIX}_{id}/{search_settings_id}"
+        )
+
     @classmethod
     def fence_key_with_ids(cls, cc_pair_id: int, search_settings_id: int) -> str:
         return f"{cls.FENCE_PREFIX}_{cc_pair_id}/{search_settings_id}"
@@ -98,12 +124,36 @@ class RedisConnectorIndex:
     @property
     def payload(self) -> RedisConnectorIndexPayload | None:
         # read related data and evaluate/print task progress
-        fence_bytes = cast(Any, self.redis.get(self.fence_key))
+        fence_bytes = cast(bytes | None, self.redis.get(self.fence_key))
         if fence_bytes is None:
             return None
 
-        fence_str = fence_bytes.decode("utf-8")
-        return RedisConnectorIndexPayload.model_validate_json(cast(str, fence_str))
+        # pydantic parses the raw bytes directly, no need to decode to str first
+        return RedisConnectorIndexPayload.model_validate_json(fence_bytes)
+
+    def snapshot(self) -> RedisConnectorIndexSnapshot:
+        """Reads the fence payload, generator progress, generator completion and
+        watchdog signal in one pipelined round trip. A missing fence shows up as a
+        None payload."""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.get(self.fence_key)
+        pipe.get(self.generator_progress_key)
+        pipe.get(self.generator_complete_key)
+        pipe.exists(self.watchdog_key)
+        fence_bytes, progress_bytes, completion_bytes, watchdog_exists = cast(
+            list, pipe.execute()
+        )
+
+        return RedisConnectorIndexSnapshot(
+            payload=(
+                RedisConnectorIndexPayload.model_validate_json(fence_bytes)
+                if fence_bytes is not None
+                else None
+            ),
+            progress=int(progress_bytes) if progress_bytes is not None else None,
+            completion=int(completion_bytes) if completion_bytes is not None else None,
+            watchdog_signaled=bool(watchdog_exists),
+        )
 
     def set_fence(
         self,
@@ -127,37 +177,69 @@ class RedisConnectorIndex:
         self.redis.set(
             f"{self.terminate_key}_{celery_task_id}", 0, ex=self.TERMINATE_TTL
         )
+        self.publish_event(self.EVENT_TERMINATE)
 
-    def set_watchdog(self, value: bool) -> None:
-        """Signal the state of the watchdog."""
+    def publish_event(self, event: str) -> None:
+        """Wakes anything waiting on the events channel (i.e. the watchdog). Events
+        are only hints, the underlying signals are still the source of truth."""
+        self.redis.publish(self.events_channel, event)
+
+    def set_watchdog(self, value: bool, pipe: Pipeline | None = None) -> None:
+        """Signal the state of the watchdog. If pipe is passed, the command is only
+        staged on it."""
+        client = pipe if pipe is not None else self.redis
         if not value:
-            self.redis.delete(self.watchdog_key)
+            client.delete(self.watchdog_key)
             return
 
-        self.redis.set(self.watchdog_key, 0, ex=self.WATCHDOG_TTL)
+        client.set(self.watchdog_key, 0, ex=self.WATCHDOG_TTL)
+
+    def watchdog_heartbeat(
+        self, celery_task_id: str | None
+    ) -> RedisConnectorIndexHeartbeat:
+        """Renews the watchdog and active signals and reads the connector activity TTL
+        and the termination signal for celery_task_id, in one pipelined round trip."""
+        pipe = self.redis.pipeline(transaction=False)
+        self.set_watchdog(True, pipe=pipe)
+        self.set_active(pipe=pipe)
+        pipe.ttl(self.connector_active_key)
+        if celery_task_id:
+            pipe.exists(f"{self.terminate_key}_{celery_task_id}")
+        results = cast(list, pipe.execute())
+
+        return RedisConnectorIndexHeartbeat(
+            connector_active_ttl=results[2],
+            terminating=bool(results[3]) if celery_task_id else False,
+        )
 
     def watchdog_signaled(self) -> bool:
         """Check the state of the watchdog."""
         return bool(self.redis.exists(self.watchdog_key))
 
-    def set_active(self) -> None:
+    def set_active(self, pipe: Pipeline | None = None) -> None:
         """This sets a signal to keep the indexing flow from getting cleaned up within
         the expiration time.
 
         The slack in timing is needed to avoid race conditions where simply checking
-        the celery queue and task status could result in race conditions."""
-        self.redis.set(self.active_key, 0, ex=self.ACTIVE_TTL)
+        the celery queue and task status could result in race conditions.
+
+        If pipe is passed, the command is only staged on it."""
+        client = pipe if pipe is not None else self.redis
+        client.set(self.active_key, 0, ex=self.ACTIVE_TTL)
 
     def active(self) -> bool:
         return bool(self.redis.exists(self.active_key))
 
-    def set_connector_active(self) -> None:
+    def set_connector_active(self, pipe: Pipeline | None = None) -> None:
         """This sets a signal to keep the indexing flow from getting cleaned up within
         the expiration time.
 
         The slack in timing is needed to avoid race conditions where simply checking
-        the celery queue and task status could result in race conditions."""
-        self.redis.set(self.connector_active_key, 0, ex=self.CONNECTOR_ACTIVE_TTL)
+        the celery queue and task status could result in race conditions.
+
+        If pipe is passed, the command is only staged on it."""
+        client = pipe if pipe is not None else self.redis
+        client.set(self.connector_active_key, 0, ex=self.CONNECTOR_ACTIVE_TTL)
 
     def connector_active(self) -> bool:
         if self.redis.exists(self.connector_active_key):
@@ -184,6 +266,7 @@ class RedisConnectorIndex:
             return
 
         self.redis.set(self.generator_complete_key, payload)
+        self.publish_event(self.EVENT_GENERATOR_COMPLETE)
 
     def generator_clear(self) -> None:
         self.redis.delete(self.generator_progress_key)
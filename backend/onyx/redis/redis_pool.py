@@ -12,6 +12,7 @@ import redis
 from fastapi import Request
 from redis import asyncio as aioredis
 from redis.client import Redis
+from redis.exceptions import LockError
 from redis.lock import Lock as RedisLock
 
 from onyx.configs.app_configs import REDIS_AUTH_KEY_PREFIX
@@ -35,6 +36,35 @@ logger = setup_logger()
 
 SCAN_ITER_COUNT_DEFAULT = 4096
 
+# Regular methods that need simple prefixing
+_TENANT_PREFIXED_METHODS = frozenset(
+    [
+        "lock",
+        "unlock",
+        "get",
+        "set",
+        "delete",
+        "exists",
+        "incrby",
+        "hset",
+        "hget",
+        "getset",
+        "owned",
+        "reacquire",
+        "create_lock",
+        "startswith",
+        "smembers",
+        "sismember",
+        "sadd",
+        "srem",
+        "scard",
+        "hexists",
+        "hdel",
+        "ttl",
+        "pttl",
+    ]
+)
+
 
 class TenantRedis(redis.Redis):
     def __init__(self, tenant_id: str, *args: Any, **kwargs: Any) -> None:
@@ -101,36 +131,39 @@ class TenantRedis(redis.Redis):
 
     def __getattribute__(self, item: str) -> Any:
         original_attr = super().__getattribute__(item)
-        methods_to_wrap = [
-            "lock",
-            "unlock",
-            "get",
-            "set",
-            "delete",
-            "exists",
-            "incrby",
-            "hset",
-            "hget",
-            "getset",
-            "owned",
-            "reacquire",
-            "create_lock",
-            "startswith",
-            "smembers",
-            "sismember",
-            "sadd",
-            "srem",
-            "scard",
-            "hexists",
-            "hset",
-            "hdel",
-            "ttl",
-            "pttl",
-        ]  # Regular methods that need simple prefixing
-
         if item == "scan_iter" or item == "sscan_iter":
             return self._prefix_scan_iter(original_attr)
-        elif item in methods_to_wrap and callable(original_attr):
+        elif item in _TENANT_PREFIXED_METHODS and callable(original_attr):
+            return self._prefix_method(original_attr)
+        return original_attr
+
+    def pipeline(
+        self, transaction: bool = True, shard_hint: str | None = None
+    ) -> "TenantPipeline":
+        # the base implementation returns a plain Pipeline, which would skip prefixing
+        return TenantPipeline(
+            self.tenant_id,
+            self.connection_pool,
+            self.response_callbacks,
+            transaction,
+            shard_hint,
+        )
+
+
+class TenantPipeline(redis.client.Pipeline):
+    """Pipeline counterpart of TenantRedis. Commands staged on it are prefixed
+    exactly as they would be when called on the TenantRedis client directly."""
+
+    def __init__(self, tenant_id: str, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.tenant_id: str = tenant_id
+
+    _prefixed = TenantRedis._prefixed
+    _prefix_method = TenantRedis._prefix_method
+
+    def __getattribute__(self, item: str) -> Any:
+        original_attr = super().__getattribute__(item)
+        if item in _TENANT_PREFIXED_METHODS and callable(original_attr):
             return self._prefix_method(original_attr)
         return original_attr
 
@@ -412,6 +445,20 @@ async def retrieve_auth_token_data_from_redis(request: Request) -> dict | None:
         )
 
 
+def release_lock_if_owned(lock: RedisLock) -> bool:
+    """Releases the lock if we still own it, returning whether we did.
+
+    Lock.release already compares the token and deletes the key in one Lua script,
+    so this is a single round trip instead of an owned() check followed by a
+    release()."""
+    try:
+        lock.release()
+    except LockError:
+        return False
+
+    return True
+
+
 def redis_lock_dump(lock: RedisLock, r: Redis) -> None:
     # diagnostic logging for lock errors
     name = lock.name
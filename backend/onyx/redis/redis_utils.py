@@ -8,22 +8,28 @@ from onyx.redis.redis_connector_prune import RedisConnectorPrune
 from onyx.redis.redis_document_set import RedisDocumentSet
 from onyx.redis.redis_usergroup import RedisUserGroup
 
+# every fence key is either the global cc pair fence or starts with one of these
+_FENCE_PREFIXES: tuple[str, ...] = (
+    RedisDocumentSet.FENCE_PREFIX,
+    RedisUserGroup.FENCE_PREFIX,
+    RedisConnectorDelete.FENCE_PREFIX,
+    RedisConnectorPrune.FENCE_PREFIX,
+    RedisConnectorIndex.FENCE_PREFIX,
+    RedisConnectorPermissionSync.FENCE_PREFIX,
+)
 
-def is_fence(key_bytes: bytes) -> bool:
-    key_str = key_bytes.decode("utf-8")
-    if key_str == RedisGlobalConnectorCredentialPair.FENCE_KEY:
-        return True
-    if key_str.startswith(RedisDocumentSet.FENCE_PREFIX):
-        return True
-    if key_str.startswith(RedisUserGroup.FENCE_PREFIX):
-        return True
-    if key_str.startswith(RedisConnectorDelete.FENCE_PREFIX):
-        return True
-    if key_str.startswith(RedisConnectorPrune.FENCE_PREFIX):
-        return True
-    if key_str.startswith(RedisConnectorIndex.FENCE_PREFIX):
-        return True
-    if key_str.startswith(RedisConnectorPermissionSync.FENCE_PREFIX):
-        return True
+# glob patterns matching every key is_fence accepts, so SCAN can filter server side
+FENCE_SCAN_PATTERNS: tuple[str, ...] = (
+    RedisGlobalConnectorCredentialPair.FENCE_KEY,
+    *(prefix + "*" for prefix in _FENCE_PREFIXES),
+)
 
-    return False
+_FENCE_KEY_BYTES = RedisGlobalConnectorCredentialPair.FENCE_KEY.encode("utf-8")
+_FENCE_PREFIXES_BYTES: tuple[bytes, ...] = tuple(
+    prefix.encode("utf-8") for prefix in _FENCE_PREFIXES
+)
+
+
+def is_fence(key_bytes: bytes) -> bool:
+    # a single startswith over all prefixes, without decoding the key
+    return key_bytes == _FENCE_KEY_BYTES or key_bytes.startswith(_FENCE_PREFIXES_BYTES)
@@ -4,6 +4,7 @@
 支持清理 INITIAL_INDEXING 和 PAUSED 状态的连接器
 """
 
+import io
 import os
 import time
 from datetime import datetime, timedelta, timezone
@@ -13,10 +14,28 @@ from onyx.db.engine.sql_engine import get_session_with_current_tenant, SqlEngine
 from onyx.db.enums import ConnectorCredentialPairStatus
 from onyx.db.models import ConnectorCredentialPair, Connector
 from onyx.utils.logger import setup_logger
-from sqlalchemy import and_, func, select, delete
+from sqlalchemy import and_, func, select, delete, text
+from sqlalchemy.orm import Session
 
 logger = setup_logger()
 
+def _load_cc_pair_ids_temp_table(db_session: Session, cc_pair_ids: list[int]) -> None:
+    """将 id 集合通过 COPY 写入事务级临时表 _cc_ids
+
+    后续语句以 IN (SELECT id FROM _cc_ids) 关联，避免把上万个 id 作为参数
+    序列化进 IN 列表；临时表在事务提交时自动删除。
+    """
+    db_session.execute(text("CREATE TEMP TABLE _cc_ids (id int PRIMARY KEY) ON COMMIT DROP"))
+    cursor = db_session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            "COPY _cc_ids (id) FROM STDIN",
+            io.StringIO("".join(f"{cc_pair_id}\n" for cc_pair_id in cc_pair_ids)),
+        )
+    finally:
+        cursor.close()
+    db_session.execute(text("ANALYZE _cc_ids"))
+
 def cleanup_old_initial_indexing_cc_pairs(days_threshold: int = 2, dry_run: bool = True):
     """快速清理历史 INITIAL_INDEXING CC Pairs (2天前的数据)"""
     
@@ -64,10 +83,10 @@ def cleanup_old_initial_indexing_cc_pairs(days_threshold: int = 2, dry_run: bool
         
         # 批量删除 CC Pairs (简单方式，依赖数据库约束)
         try:
-            delete_stmt = delete(ConnectorCredentialPair).where(
-                ConnectorCredentialPair.id.in_(cc_pair_ids)
+            _load_cc_pair_ids_temp_table(db_session, cc_pair_ids)
+            result = db_session.execute(
+                text("DELETE FROM connector_credential_pair WHERE id IN (SELECT id FROM _cc_ids)")
             )
-            result = db_session.execute(delete_stmt)
             db_session.commit()
             
             logger.info(f"Successfully deleted {result.rowcount} CC pairs")
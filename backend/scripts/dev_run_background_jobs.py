@@ -85,7 +85,7 @@ def run_jobs() -> None:
         "worker",
         "--pool=threads",
         "--concurrency=6",
-        "--prefetch-multiplier=2",
+        "--prefetch-multiplier=1",
         "--loglevel=INFO",
         "--hostname=indexing@%n",
         "--queues=connector_indexing",
@@ -0,0 +1,21 @@
+import pytest
+
+from onyx.background.celery.tasks.indexing.tasks import parse_indexing_fence_key
+from onyx.redis.redis_connector_index import RedisConnectorIndex
+
+
+@pytest.mark.parametrize(
+    "key,expected",
+    [
+        (f"{RedisConnectorIndex.FENCE_PREFIX}_1/2".encode(), (1, 2)),
+        (f"{RedisConnectorIndex.FENCE_PREFIX}_123/45678".encode(), (123, 45678)),
+        (f"{RedisConnectorIndex.FENCE_PREFIX}_1".encode(), None),
+        (f"{RedisConnectorIndex.FENCE_PREFIX}_a/2".encode(), None),
+        (f"{RedisConnectorIndex.FENCE_PREFIX}_1/2/3".encode(), None),
+        (f"{RedisConnectorIndex.FENCE_PREFIX}_1/2_extra".encode(), None),
+        (b"connectordeletion_fence_1", None),
+        (b"", None),
+    ],
+)
+def test_parse_indexing_fence_key(key: bytes, expected: tuple[int, int] | None) -> None:
+    assert parse_indexing_fence_key(key) == expected
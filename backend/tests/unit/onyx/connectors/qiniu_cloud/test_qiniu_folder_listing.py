@@ -0,0 +1,68 @@
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("qiniu")
+
+from onyx.connectors.qiniu_cloud.connector import QiniuCloudConnector  # noqa: E402
+
+
+def _make_connector(pages: list[list[str]], prefix: str = "") -> QiniuCloudConnector:
+    connector = QiniuCloudConnector(
+        bucket_name="test-bucket",
+        bucket_domain="example.com",
+        prefix=prefix,
+    )
+
+    responses: list[tuple[dict[str, Any], bool, Any]] = [
+        (
+            {"items": [{"key": key} for key in keys], "marker": f"m{i}"},
+            i == len(pages) - 1,
+            None,
+        )
+        for i, keys in enumerate(pages)
+    ]
+    bucket_manager = MagicMock()
+    bucket_manager.list.side_effect = responses
+    connector.auth = MagicMock()
+    connector.bucket_manager = bucket_manager
+    connector._is_initialized = True
+    return connector
+
+
+def test_iter_all_objects_dedups_folders_across_pages() -> None:
+    connector = _make_connector(
+        [
+            ["docs/a-b/1.txt", "docs/a/.folder_placeholder", "docs/a/1.txt"],
+            ["docs/a/2.txt", "docs/b/1.txt", "docs/root.txt"],
+        ],
+        prefix="docs",
+    )
+
+    keys = [item["key"] for item in connector._iter_all_objects("docs/")]
+
+    assert len(keys) == 6
+    assert connector.bucket_manager.list.call_count == 2
+    # one entry per folder, in listing order, without files at the prefix root
+    assert connector.list_folders() == ["a-b", "a", "b"]
+    # the cached folders are reused without listing the bucket again
+    assert connector.bucket_manager.list.call_count == 2
+
+
+def test_iter_all_objects_skips_sibling_prefixes() -> None:
+    connector = _make_connector([["docs/a/1.txt", "docs2/b/1.txt"]], prefix="docs")
+
+    list(connector._iter_all_objects("docs"))
+
+    assert connector.list_folders() == ["a"]
+
+
+def test_partial_iteration_does_not_cache_folders() -> None:
+    connector = _make_connector([["a/1.txt"], ["b/1.txt"]])
+
+    iterator = connector._iter_all_objects("")
+    next(iterator)
+    iterator.close()
+
+    assert connector._folder_cache is None
@@ -0,0 +1,62 @@
+from unittest.mock import MagicMock
+
+from redis.exceptions import LockError
+
+from onyx.redis.redis_pool import release_lock_if_owned
+from onyx.redis.redis_pool import TenantPipeline
+from onyx.redis.redis_pool import TenantRedis
+
+
+TENANT_ID = "tenant_abc"
+
+
+def _staged_commands(pipe: TenantPipeline) -> list[tuple]:
+    # each entry in the command stack is (args, options); no server is needed
+    return [args for args, _ in pipe.command_stack]
+
+
+def test_pipeline_prefixes_keys() -> None:
+    r = TenantRedis(TENANT_ID)
+    pipe = r.pipeline(transaction=False)
+    assert isinstance(pipe, TenantPipeline)
+
+    pipe.exists("connectorindexing_fence_1/2")
+    pipe.get("some_key")
+    pipe.set("other_key", 1, ex=60)
+    pipe.srem("active_fences", "connectorindexing_fence_1/2")
+    pipe.ttl("ttl_key")
+
+    assert _staged_commands(pipe) == [
+        ("EXISTS", f"{TENANT_ID}:connectorindexing_fence_1/2"),
+        ("GET", f"{TENANT_ID}:some_key"),
+        ("SET", f"{TENANT_ID}:other_key", 1, "EX", 60),
+        ("SREM", f"{TENANT_ID}:active_fences", "connectorindexing_fence_1/2"),
+        ("TTL", f"{TENANT_ID}:ttl_key"),
+    ]
+
+
+def test_pipeline_does_not_double_prefix() -> None:
+    r = TenantRedis(TENANT_ID)
+    pipe = r.pipeline()
+
+    pipe.get(f"{TENANT_ID}:already_prefixed")
+    pipe.get(f"{TENANT_ID}:bytes_key".encode())
+
+    assert _staged_commands(pipe) == [
+        ("GET", f"{TENANT_ID}:already_prefixed"),
+        ("GET", f"{TENANT_ID}:bytes_key".encode()),
+    ]
+
+
+def test_release_lock_if_owned_releases() -> None:
+    lock = MagicMock()
+
+    assert release_lock_if_owned(lock) is True
+    lock.release.assert_called_once_with()
+
+
+def test_release_lock_if_owned_not_owned() -> None:
+    lock = MagicMock()
+    lock.release.side_effect = LockError("not owned")
+
+    assert release_lock_if_owned(lock) is False